@@ -5,39 +5,56 @@ It handles portfolio creation via resume upload and chat-based interaction,
 using Groq LLM for content generation and Supabase for storage.
 """
 
+import asyncio
+import base64
 import os
 import uuid
+import hashlib
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, List, Dict, Any, Union
 from enum import Enum
 from dotenv import load_dotenv
 import json
+import orjson
+import random
 import re
 from pathlib import Path
 from jinja2 import Environment, FileSystemLoader
+import threading
 import time
 
 # FastAPI and Pydantic
-from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks, Query, Body, Request
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Body, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from pydantic import BaseModel, Field
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field, TypeAdapter
 
 # Database
-from supabase import create_client, Client
+import asyncpg
+import httpx
 
 # LLM
 import groq
 
+# Session store and read caching
+import redis.asyncio
+from cachetools import TTLCache
+
+# Background job queue (optional, activates when REDIS_URL is set)
+from arq import create_pool
+from arq.connections import RedisSettings
+
 # File processing
 import PyPDF2
 import docx
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 
 # Import secrets manager
-from secrets_manager import get_supabase_url, get_supabase_key, get_groq_api_key
+from secrets_manager import get_supabase_url, get_supabase_key, get_groq_api_keys
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -46,50 +63,257 @@ logger = logging.getLogger(__name__)
 # Load environment variables from .env if present
 load_dotenv()
 
-def convert_datetimes_to_iso(data):
+# One compiled TypeAdapter per model class, built lazily and reused so the
+# pydantic-core serializer is only constructed once per type
+_model_adapters: Dict[type, TypeAdapter] = {}
+
+def _adapter_for(model_type: type) -> TypeAdapter:
+    adapter = _model_adapters.get(model_type)
+    if adapter is None:
+        adapter = _model_adapters[model_type] = TypeAdapter(model_type)
+    return adapter
+
+def model_to_row(model: BaseModel) -> dict:
+    """
+    Serialize a Pydantic model to a JSON-safe dict for a Supabase insert.
+    Uses the cached compiled TypeAdapter, so datetime-to-ISO conversion runs
+    in pydantic-core's Rust serializer rather than Python.
+    """
+    return _adapter_for(type(model)).dump_python(model, mode="json")
+
+def model_to_json(model: BaseModel) -> bytes:
     """
-    Recursively convert datetime objects in a dictionary to ISO format strings.
+    Serialize a Pydantic model straight to a JSON request body. Skips the
+    intermediate dict entirely: pydantic-core writes the bytes that go on
+    the wire.
     """
-    if isinstance(data, dict):
-        return {k: convert_datetimes_to_iso(v) for k, v in data.items()}
-    elif isinstance(data, list):
-        return [convert_datetimes_to_iso(item) for item in data]
-    elif hasattr(data, 'isoformat'):
-        return data.isoformat()
-    return data
+    return _adapter_for(type(model)).dump_json(model)
 
-logger.info("convert_datetimes_to_iso function loaded at module level")
+def utc_now() -> datetime:
+    """
+    Timezone-aware replacement for the deprecated datetime.utcnow(). The
+    timestamp columns are timestamptz, so sending aware values also stops
+    the database from reinterpreting naive timestamps in its own zone.
+    """
+    return datetime.now(timezone.utc)
 
-# Initialize Supabase client
+# Load Supabase credentials
 try:
     supabase_url = get_supabase_url()
     supabase_key = get_supabase_key()
     if not supabase_url or not supabase_key:
         raise ValueError("Missing Supabase credentials")
-    supabase = create_client(supabase_url, supabase_key)
-    logger.info("Supabase client initialized successfully")
 except Exception as e:
-    logger.error(f"Failed to initialize Supabase client: {str(e)}")
+    logger.error(f"Failed to load Supabase credentials: {str(e)}")
     raise
 
-# Initialize in-memory stores
-chat_sessions_store = {}
+# ===== DATABASE CLIENTS AND HELPERS START =====
+# Route handlers go through the async httpx-based PostgREST helpers and await
+# every call; background worker threads use the pooled sync client below.
+# Both keep warm keep-alive connections instead of re-handshaking per call.
+
+db_client = httpx.AsyncClient(
+    base_url=f"{supabase_url}/rest/v1",
+    headers={
+        "apikey": supabase_key,
+        "Authorization": f"Bearer {supabase_key}",
+        "Content-Type": "application/json",
+    },
+    timeout=30.0,
+    # HTTP/2 multiplexes concurrent PostgREST calls over one TLS connection,
+    # avoiding per-request handshakes under load
+    http2=True,
+    limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+)
 
-# Initialize Groq client
+# Pooled sync PostgREST client for background jobs. Worker threads used to go
+# through supabase-py's default session; this client keeps warm keep-alive
+# connections and retries transient connection errors, so job writes don't
+# pay a TLS handshake each time.
+db_client_sync = httpx.Client(
+    base_url=f"{supabase_url}/rest/v1",
+    headers={
+        "apikey": supabase_key,
+        "Authorization": f"Bearer {supabase_key}",
+        "Content-Type": "application/json",
+    },
+    timeout=30.0,
+    transport=httpx.HTTPTransport(
+        retries=2,
+        http2=True,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+    ),
+)
+
+def db_update_sync(table: str, data: Dict[str, Any], filters: Dict[str, Any]) -> list:
+    """Blocking counterpart of db_update for background worker threads"""
+    params = {column: f"eq.{value}" for column, value in filters.items()}
+    response = db_client_sync.patch(
+        f"/{table}", params=params, json=data, headers={"Prefer": "return=representation"}
+    )
+    response.raise_for_status()
+    return response.json()
+
+# Direct Postgres pool for read queries. When SUPABASE_DB_URL is configured,
+# selects skip the PostgREST HTTP hop entirely and run on pooled, persistent
+# connections; writes and deployments without the DSN stay on PostgREST.
+db_pool: Optional[asyncpg.Pool] = None
+DB_DSN = os.getenv("SUPABASE_DB_URL")
+
+async def _init_pg_connection(conn):
+    """Match PostgREST's JSON-friendly types: jsonb as dicts, uuids as strings"""
+    await conn.set_type_codec('jsonb', encoder=json.dumps, decoder=json.loads, schema='pg_catalog')
+    await conn.set_type_codec('uuid', encoder=str, decoder=str, schema='pg_catalog')
+
+def _build_select_sql(table, columns, filters, order, desc, limit, offset):
+    """Build a parametrized SELECT; identifiers all come from code literals"""
+    sql = [f"SELECT {columns} FROM {table}"]
+    args = []
+    if filters:
+        clauses = []
+        for column, value in filters.items():
+            args.append(value)
+            clauses.append(f"{column} = ${len(args)}")
+        sql.append("WHERE " + " AND ".join(clauses))
+    if order:
+        sql.append(f"ORDER BY {order} {'DESC' if desc else 'ASC'}")
+    if limit is not None:
+        sql.append(f"LIMIT {int(limit)}")
+    if offset is not None:
+        sql.append(f"OFFSET {int(offset)}")
+    return " ".join(sql), args
+
+async def db_select(
+    table: str,
+    filters: Optional[Dict[str, Any]] = None,
+    columns: str = "*",
+    order: Optional[str] = None,
+    desc: bool = False,
+    limit: Optional[int] = None,
+    offset: Optional[int] = None,
+    single: bool = False,
+):
+    """
+    Run a select; returns a list of rows, or one row / None when single.
+    A single lookup is just a limit-1 select, so a missing row comes back
+    as None for the caller to map to a 404 instead of an error from the
+    database layer.
+    """
+    if single:
+        limit = 1
+    if db_pool is not None:
+        sql, args = _build_select_sql(table, columns, filters, order, desc, limit, offset)
+        async with db_pool.acquire() as conn:
+            rows = await conn.fetch(sql, *args)
+        if single:
+            return dict(rows[0]) if rows else None
+        return [dict(row) for row in rows]
+
+    params = {"select": columns}
+    for column, value in (filters or {}).items():
+        params[column] = f"eq.{value}"
+    if order:
+        params["order"] = f"{order}.desc" if desc else f"{order}.asc"
+    if limit is not None:
+        params["limit"] = str(limit)
+    if offset is not None:
+        params["offset"] = str(offset)
+    response = await db_client.get(f"/{table}", params=params)
+    response.raise_for_status()
+    rows = response.json()
+    if single:
+        return rows[0] if rows else None
+    return rows
+
+async def db_insert(table: str, data) -> list:
+    """
+    Insert one row (dict), several rows (list of dicts), or a pre-serialized
+    JSON body (bytes/str); returns the inserted rows
+    """
+    headers = {"Prefer": "return=representation"}
+    if isinstance(data, (bytes, str)):
+        response = await db_client.post(f"/{table}", content=data, headers=headers)
+    else:
+        response = await db_client.post(f"/{table}", json=data, headers=headers)
+    response.raise_for_status()
+    return response.json()
+
+async def db_upsert(table: str, data, on_conflict: str = "id") -> list:
+    """
+    Insert rows, merging into the existing ones on conflict; returns the
+    resulting rows. Accepts the same body shapes as db_insert. A retried
+    submission with the same id updates the row instead of failing on the
+    primary-key conflict.
+    """
+    headers = {"Prefer": "return=representation,resolution=merge-duplicates"}
+    params = {"on_conflict": on_conflict}
+    if isinstance(data, (bytes, str)):
+        response = await db_client.post(f"/{table}", params=params, content=data, headers=headers)
+    else:
+        response = await db_client.post(f"/{table}", params=params, json=data, headers=headers)
+    response.raise_for_status()
+    return response.json()
+
+async def db_update(table: str, data: Dict[str, Any], filters: Dict[str, Any]) -> list:
+    """Update rows matching the filters; returns the updated rows"""
+    params = {column: f"eq.{value}" for column, value in filters.items()}
+    response = await db_client.patch(
+        f"/{table}", params=params, json=data, headers={"Prefer": "return=representation"}
+    )
+    response.raise_for_status()
+    return response.json()
+
+async def db_rpc(function: str, args: Dict[str, Any]):
+    """Call a Postgres function exposed through PostgREST"""
+    response = await db_client.post(f"/rpc/{function}", json=args)
+    response.raise_for_status()
+    return response.json() if response.content else None
+
+# ===== DATABASE CLIENTS AND HELPERS END =====
+
+# Worker pool for LLM/parse heavy background jobs. FastAPI's BackgroundTasks
+# runs tasks on the server's own thread pool after the response, so long LLM
+# chains would compete with request handling; a dedicated executor keeps them
+# off the serving path and bounds concurrency.
+background_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("BACKGROUND_WORKERS", "4")),
+    thread_name_prefix="portfolioai-bg"
+)
+
+# Initialize Groq clients (one per configured API key; rate-limited calls
+# rotate between them so each extra key adds quota)
 try:
-    groq_api_key = get_groq_api_key()
-    if not groq_api_key:
+    groq_api_keys = get_groq_api_keys()
+    if not groq_api_keys:
         raise ValueError("Missing Groq API key")
-    groq_client = groq.Client(api_key=groq_api_key)
-    logger.info("Groq client initialized successfully")
+    groq_clients = [groq.Client(api_key=key) for key in groq_api_keys]
+    groq_client = groq_clients[0]
+    logger.info(f"Groq client initialized successfully with {len(groq_clients)} API key(s)")
 except Exception as e:
     logger.error(f"Failed to initialize Groq client: {str(e)}")
     raise
 
-# Initialize Jinja2 environment
-template_env = Environment(loader=FileSystemLoader('.'))
+# Initialize Jinja2 environment; auto_reload off so the compiled template is
+# reused without re-statting the file on every render
+template_env = Environment(loader=FileSystemLoader('.'), auto_reload=False)
 portfolio_template = template_env.get_template('portfolio_template.html')
 
+# Static portfolio stylesheet, read once at startup. The LLM used to
+# regenerate equivalent boilerplate CSS for every portfolio.
+portfolio_css = Path(__file__).parent.joinpath('portfolio_template.css').read_text()
+
+def render_portfolio_html(structured_data: dict) -> str:
+    """Render portfolio HTML from structured section data via the precompiled template"""
+    return portfolio_template.render(
+        title=structured_data.get("Name", "Portfolio"),
+        about_me=structured_data.get("About Me", ""),
+        skills=structured_data.get("Skills", []),
+        work_experience=structured_data.get("Work Experience", []),
+        projects=structured_data.get("Projects", []),
+        education=structured_data.get("Education", []),
+        year=utc_now().year
+    )
+
 # ===== MODEL DEFINITIONS START =====
 class PortfolioMethod(str, Enum):
     RESUME = "resume"
@@ -113,15 +337,26 @@ class Portfolio(BaseModel):
     resume_id: Optional[str] = None
     job_description_id: Optional[str] = None
     chat_session_id: Optional[str] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
+
+class PortfolioSummary(BaseModel):
+    """Lightweight projection of Portfolio for list endpoints; leaves out
+    the content/html/css blobs that only the detail and export views need"""
+    id: str
+    user_id: str
+    title: str
+    method: PortfolioMethod
+    status: PortfolioStatus
+    created_at: datetime
+    updated_at: datetime
 
 class Resume(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     user_id: str
     content: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
 
 class OptimizedResume(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -129,16 +364,16 @@ class OptimizedResume(BaseModel):
     job_description_id: str
     original_resume_id: str
     content: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
 
 class JobDescription(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     user_id: str
     title: str
     content: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
 
 class JobDescriptionCreate(BaseModel):
     user_id: str
@@ -151,8 +386,8 @@ class CoverLetter(BaseModel):
     job_description_id: str
     resume_id: str
     content: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
 
 class CoverLetterGenerateRequest(BaseModel):
     user_id: str
@@ -170,15 +405,24 @@ class ChatSession(BaseModel):
     title: str
     current_question: Optional[str] = None
     status: PortfolioStatus
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
+
+class ChatSessionSummary(BaseModel):
+    """Lightweight projection of ChatSession for list endpoints"""
+    id: str
+    user_id: str
+    title: str
+    status: PortfolioStatus
+    created_at: datetime
+    updated_at: datetime
 
 class ChatMessage(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     chat_session_id: str
     content: str
     role: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
 
 class ChatStartRequest(BaseModel):
     user_id: str
@@ -198,8 +442,8 @@ class InterviewSession(BaseModel):
     job_description_id: str
     questions: List[InterviewQuestion]
     score: Optional[int] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
 
 class InterviewScore(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -208,7 +452,7 @@ class InterviewScore(BaseModel):
     job_role: str
     score: int
     feedback: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
 
 class InterviewStartRequest(BaseModel):
     user_id: str
@@ -229,8 +473,8 @@ class CareerGuide(BaseModel):
     job_description_id: str
     resume_id: str
     content: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
 
 class CareerGuideGenerateRequest(BaseModel):
     user_id: str
@@ -243,27 +487,120 @@ class PortfolioGenerateRequest(BaseModel):
     job_description_id: Optional[str] = None
     resume_id: Optional[str] = None
     chat_session_id: Optional[str] = None
+    # Optional idempotency key: a client that retries a submission with the
+    # same id updates the existing row instead of creating a duplicate
+    id: Optional[str] = None
 
 # ===== MODEL DEFINITIONS END =====
 
 # ===== SERVICE CLASSES START =====
+
+# Precompiled resume heading patterns used to cut each sectional prompt down
+# to the relevant snippet instead of sending the whole resume per section
+SECTION_HEADING_PATTERNS = {
+    "About Me": re.compile(r'^\s*(summary|about( me)?|profile|objective)\b', re.IGNORECASE | re.MULTILINE),
+    "Skills": re.compile(r'^\s*((technical |key )?skills|technologies|competencies)\b', re.IGNORECASE | re.MULTILINE),
+    "Work Experience": re.compile(r'^\s*((work|professional )?experience|employment( history)?)\b', re.IGNORECASE | re.MULTILINE),
+    "Projects": re.compile(r'^\s*((personal |academic )?projects)\b', re.IGNORECASE | re.MULTILINE),
+    "Education": re.compile(r'^\s*(education|academics|qualifications)\b', re.IGNORECASE | re.MULTILINE),
+}
+ANY_SECTION_HEADING = re.compile(
+    r'^\s*(summary|about( me)?|profile|objective'
+    r'|(technical |key )?skills|technologies|competencies'
+    r'|(work|professional )?experience|employment( history)?'
+    r'|(personal |academic )?projects'
+    r'|education|academics|qualifications)\b',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Splitter for comma/newline separated skill answers in the chat flow,
+# compiled once instead of per request
+_SKILL_SPLIT = re.compile(r'[\n,]+')
+
+# The scripted portfolio-chat questions. They are identical for every
+# session, so session snapshots only store progress and answers and index
+# into this tuple
+CHAT_QUESTIONS = (
+    "What is your full name?",
+    "What is your most recent job title?",
+    "List your top skills.",
+    "Describe your work experience.",
+    "List your projects.",
+    "List your education qualifications"
+)
+
+# Expected JSON value shape per portfolio section, matching what
+# portfolio_template.html renders
+SECTION_VALUE_SPECS = {
+    "About Me": "a short professional summary as a plain string",
+    "Skills": "a JSON array of skill names",
+    "Work Experience": "a JSON array of objects with keys \"Company\", \"Designation\", \"Duration\", \"Description\"",
+    "Projects": "a JSON array of objects with keys \"Name\", \"Description\"",
+    "Education": "a JSON array of objects with keys \"Degree\", \"Institution\", \"Board\", \"Description\"",
+}
+
 class LLMService:
     """Handles all LLM interactions using Groq"""
-    
+
     def __init__(self):
         self.model = "meta-llama/llama-4-scout-17b-16e-instruct"
-        self.client = groq_client  # Use the globally initialized groq_client
-    
+        self.clients = groq_clients  # Use the globally initialized clients
+        self._client_index = 0
+        self.max_retries = 5
+        self.base_backoff = 1.0  # seconds, doubled on each rate-limited attempt
+
+    @property
+    def client(self):
+        """The Groq client currently in rotation."""
+        return self.clients[self._client_index]
+
+    def _rotate_client(self):
+        """Advance to the next API key after a rate limit."""
+        self._client_index = (self._client_index + 1) % len(self.clients)
+
+    @staticmethod
+    def _retry_delay(error, attempt: int, base: float) -> float:
+        """Work out how long to wait before retrying a rate-limited call.
+
+        Honors the Retry-After header when Groq sends one, otherwise falls
+        back to exponential backoff. Jitter is added either way so parallel
+        background jobs don't retry in lockstep.
+        """
+        delay = base * (2 ** attempt)
+        response = getattr(error, 'response', None)
+        if response is not None:
+            retry_after = response.headers.get('retry-after')
+            if retry_after:
+                try:
+                    delay = float(retry_after)
+                except ValueError:
+                    pass
+        return delay + random.uniform(0, 0.5)
+
     def _call_llm(self, prompt: str, temperature: float = 0.7, max_tokens: int = 2000) -> str:
         """Generic method to call the LLM with a prompt"""
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=temperature,
-                max_tokens=max_tokens
-            )
-            return response.choices[0].message.content.strip()
+            for attempt in range(self.max_retries + 1):
+                try:
+                    response = self.client.chat.completions.create(
+                        model=self.model,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=temperature,
+                        max_tokens=max_tokens
+                    )
+                    return response.choices[0].message.content.strip()
+                except groq.RateLimitError as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    self._rotate_client()
+                    if len(self.clients) > 1 and (attempt + 1) % len(self.clients) != 0:
+                        # Another key with its own quota is available; try it
+                        # immediately and only back off once all keys are hot.
+                        logger.warning(f"Groq rate limit hit, rotating to next API key (attempt {attempt + 1}/{self.max_retries})")
+                        continue
+                    delay = self._retry_delay(e, attempt, self.base_backoff)
+                    logger.warning(f"Groq rate limit hit, retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+                    time.sleep(delay)
         except Exception as e:
             logger.error(f"Error calling LLM: {str(e)}")
             raise HTTPException(status_code=500, detail="Error calling LLM service")
@@ -277,66 +614,121 @@ class LLMService:
         content = re.sub(r'^.*?(?=<)', '', content, flags=re.DOTALL)
         return content.strip()
 
+    def _parse_json_response(self, raw: str, context: str) -> dict:
+        """Parse an LLM response as JSON, falling back to extracting an embedded object"""
+        try:
+            return json.loads(raw)
+        except Exception:
+            # Fallback: extract JSON from code block
+            match = re.search(r'\{[\s\S]*\}', raw)
+            if match:
+                try:
+                    return json.loads(match.group(0))
+                except Exception as e2:
+                    logger.error(f"Error parsing extracted JSON: {str(e2)}")
+            logger.error(f"Error parsing LLM {context} response as JSON: {raw}")
+            raise HTTPException(status_code=500, detail="LLM did not return valid JSON")
+
+    def extract_section_snippet(self, resume_text: str, section: str) -> str:
+        """Return the portion of the resume under the heading for a section.
+
+        Falls back to the full text when no matching heading is found, so
+        unusual resume layouts still get analyzed.
+        """
+        match = SECTION_HEADING_PATTERNS[section].search(resume_text)
+        if not match:
+            return resume_text
+        start = match.end()
+        next_heading = ANY_SECTION_HEADING.search(resume_text, start)
+        end = next_heading.start() if next_heading else len(resume_text)
+        snippet = resume_text[start:end].strip()
+        return snippet or resume_text
+
+    def _extract_section(self, resume_text: str, section: str):
+        """Extract a single portfolio section from the relevant resume snippet"""
+        snippet = self.extract_section_snippet(resume_text, section)
+        prompt = (
+            f"Extract the {section} information from the following resume excerpt. "
+            f"Return ONLY a valid JSON object of the form {{\"{section}\": ...}} "
+            f"where the value is {SECTION_VALUE_SPECS[section]}. "
+            "Do NOT include any markdown, explanation, or code blocks.\n\n"
+            f"Resume excerpt:\n{snippet}"
+        )
+        raw = self._call_llm(prompt, max_tokens=1000)
+        parsed = self._parse_json_response(raw, f"extract_section[{section}]")
+        default = "" if section == "About Me" else []
+        return parsed.get(section, default)
+
+    def _extract_all_sections(self, resume_text: str) -> dict:
+        """Extract every portfolio section from the whole resume in one call"""
+        spec = "; ".join(f'"{s}" is {SECTION_VALUE_SPECS[s]}' for s in SECTION_VALUE_SPECS)
+        prompt = (
+            "Extract the portfolio information from the following resume. "
+            "Return ONLY a valid JSON object with exactly these keys, where "
+            f"{spec}. "
+            "Do NOT include any markdown, explanation, or code blocks.\n\n"
+            f"Resume:\n{resume_text}"
+        )
+        raw = self._call_llm(prompt, max_tokens=2000)
+        parsed = self._parse_json_response(raw, "extract_all_sections")
+        return {s: parsed.get(s, "" if s == "About Me" else []) for s in SECTION_VALUE_SPECS}
+
     def analyze_resume(self, resume_text: str) -> dict:
-        """Analyze resume text and structure it into portfolio sections"""
+        """Analyze resume text and structure it into portfolio sections.
+
+        Each section is extracted with its own short prompt that only carries
+        the matching resume snippet; the five calls run in parallel, so total
+        prompt tokens drop severalfold without adding wall-clock time. When
+        no headings are recognized at all (PyPDF2 extraction often loses
+        them), the per-section snippets would each be the full text, so a
+        single combined prompt is cheaper — use the one-call path instead.
+        """
         try:
-            prompt = (
-                "Analyze the following resume and structure it into a professional portfolio. "
-                "Return ONLY a valid JSON object with these sections: About Me, Skills, Work Experience, Projects, Education. "
-                "Do NOT include any markdown, explanation, or code blocks. "
-                "Example: {\"About Me\": ..., \"Skills\": ..., ...}\n\n"
-                f"Resume text:\n{resume_text}"
-            )
-            logger.info(f"Calling LLM analyze_resume with prompt: {prompt[:200]}...")
-            raw = self._call_llm(prompt)
-            logger.info(f"LLM analyze_resume raw response: {raw}")
-            try:
-                return json.loads(raw)
-            except Exception:
-                # Fallback: extract JSON from code block
-                match = re.search(r'\{[\s\S]*\}', raw)
-                if match:
-                    try:
-                        return json.loads(match.group(0))
-                    except Exception as e2:
-                        logger.error(f"Error parsing extracted JSON: {str(e2)}")
-                logger.error(f"Error parsing LLM analyze_resume response as JSON: {raw}")
-                raise HTTPException(status_code=500, detail="LLM did not return valid JSON")
+            sections = list(SECTION_VALUE_SPECS)
+            if not any(SECTION_HEADING_PATTERNS[s].search(resume_text) for s in sections):
+                structured = self._extract_all_sections(resume_text)
+                logger.info(f"LLM analyze_resume structured sections (combined fallback): {list(structured)}")
+                return structured
+            with ThreadPoolExecutor(max_workers=len(sections)) as pool:
+                values = list(pool.map(lambda s: self._extract_section(resume_text, s), sections))
+            structured = dict(zip(sections, values))
+            logger.info(f"LLM analyze_resume structured sections: {list(structured)}")
+            return structured
         except Exception as e:
             logger.error(f"Error in resume analysis: {str(e)}")
             raise HTTPException(status_code=500, detail="Error analyzing resume")
 
+    def analyze_and_render_portfolio(self, resume_text: str) -> dict:
+        """Analyze a resume and produce portfolio sections, HTML and CSS"""
+        try:
+            structured_data = self.analyze_resume(resume_text)
+            # The candidate's name is by convention the first line of the
+            # resume; no LLM call needed for it
+            first_line = next((line.strip() for line in resume_text.splitlines() if line.strip()), "")
+            structured_data.setdefault("Name", first_line or "Portfolio")
+
+            html_content = render_portfolio_html(structured_data)
+
+            return {
+                "content": structured_data,
+                "html": html_content,
+                "css": portfolio_css
+            }
+        except Exception as e:
+            logger.error(f"Error in combined resume analysis: {str(e)}")
+            raise HTTPException(status_code=500, detail="Error analyzing resume")
+
     def generate_portfolio_content(self, structured_data: dict) -> dict:
         """Generate HTML and CSS for portfolio from structured data"""
         try:
             # Generate HTML content using our template
-            html_content = portfolio_template.render(
-                title=structured_data.get("Name", "Portfolio"),
-                about_me=structured_data.get("About Me", ""),
-                skills=structured_data.get("Skills", []),
-                work_experience=structured_data.get("Work Experience", []),
-                projects=structured_data.get("Projects", []),
-                education=structured_data.get("Education", [])
-            )
-
-            # Generate CSS content
-            css_prompt = (
-                "Generate modern, responsive CSS for a portfolio template. "
-                "Use CSS Grid and Flexbox for layout. "
-                "Include a clean, professional color scheme. "
-                "Make it mobile-responsive. "
-                "Do NOT include any JavaScript. "
-                "Do NOT include any markdown formatting or code block markers. "
-                "Return ONLY the raw CSS content.\n\n"
-                "The HTML structure uses these classes: "
-                "header, main, section, h1, h2, .skills-list, .skill-tag, "
-                ".card-list, .card, footer"
-            )
-            css_content = self._clean_html_content(self._call_llm(css_prompt))
+            html_content = render_portfolio_html(structured_data)
 
+            # Use the static stylesheet; the LLM used to regenerate the same
+            # boilerplate CSS on every call
             return {
                 "html": html_content,
-                "css": css_content
+                "css": portfolio_css
             }
         except Exception as e:
             logger.error(f"Error generating portfolio content: {str(e)}")
@@ -473,18 +865,7 @@ class LLMService:
                 f"Job Description:\n{job_description}"
             )
             raw = self._call_llm(prompt)
-            try:
-                return json.loads(raw)
-            except Exception:
-                # Fallback: extract JSON from code block
-                match = re.search(r'\{[\s\S]*\}', raw)
-                if match:
-                    try:
-                        return json.loads(match.group(0))
-                    except Exception as e2:
-                        logger.error(f"Error parsing extracted JSON: {str(e2)}")
-                logger.error(f"Error parsing LLM analyze_job_description response as JSON: {raw}")
-                raise HTTPException(status_code=500, detail="LLM did not return valid JSON")
+            return self._parse_json_response(raw, "analyze_job_description")
         except Exception as e:
             logger.error(f"Error analyzing job description: {str(e)}")
             raise HTTPException(status_code=500, detail="Error analyzing job description")
@@ -550,30 +931,74 @@ Return the enhanced portfolio content in the same structured format."""
 
 # ===== SERVICE CLASSES END =====
 
+class ChatSessionStore:
+    """
+    In-flight chat session state, backed by Redis when REDIS_URL is set.
+
+    Redis keys carry a TTL so abandoned sessions expire instead of leaking
+    memory, and any worker can serve any session. The client is the asyncio
+    one so lookups never block the event loop. Without REDIS_URL the store
+    falls back to a process-local dict, which only works for single-worker
+    deployments.
+    """
+
+    TTL_SECONDS = 3600
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self._local: Dict[str, dict] = {}
+        self._redis = None
+        if redis_url:
+            self._redis = redis.asyncio.Redis.from_url(
+                redis_url,
+                decode_responses=True,
+                max_connections=20
+            )
+            logger.info("Chat session store backed by Redis")
+        else:
+            logger.info("Chat session store is process-local (set REDIS_URL to scale workers)")
+
+    async def get(self, session_id: str) -> Optional[dict]:
+        if self._redis is not None:
+            raw = await self._redis.get(f"chat:{session_id}")
+            return json.loads(raw) if raw else None
+        return self._local.get(session_id)
+
+    async def set(self, session_id: str, state: dict) -> None:
+        if self._redis is not None:
+            await self._redis.setex(f"chat:{session_id}", self.TTL_SECONDS, json.dumps(state))
+        else:
+            self._local[session_id] = state
+
+    async def delete(self, session_id: str) -> None:
+        if self._redis is not None:
+            await self._redis.delete(f"chat:{session_id}")
+        else:
+            self._local.pop(session_id, None)
+
 class FileProcessingService:
     """Handles file processing operations for resumes and other documents"""
-    
-    async def process_file_bytes(self, file_bytes: bytes, filename: str) -> str:
+
+    def process_file(self, file_obj, filename: str) -> str:
         """
-        Process uploaded file bytes and extract text content.
-        Supports PDF and DOCX files.
+        Extract text content from an uploaded file object.
+        Supports PDF and DOCX files; the parsers read the file-like object
+        directly, so no intermediate bytes copy is made.
         """
         try:
             if filename.lower().endswith('.pdf'):
-                return await self._process_pdf(file_bytes)
+                return self._process_pdf(file_obj)
             elif filename.lower().endswith(('.doc', '.docx')):
-                return await self._process_docx(file_bytes)
+                return self._process_docx(file_obj)
             else:
                 raise ValueError(f"Unsupported file type: {filename}")
         except Exception as e:
             logger.error(f"Error processing file {filename}: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
-    
-    async def _process_pdf(self, file_bytes: bytes) -> str:
-        """Extract text from PDF file bytes"""
+
+    def _process_pdf(self, file_obj) -> str:
+        """Extract text from a PDF file object"""
         try:
-            pdf_file = BytesIO(file_bytes)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
+            pdf_reader = PyPDF2.PdfReader(file_obj)
             text = ""
             for page in pdf_reader.pages:
                 text += page.extract_text() + "\n"
@@ -581,12 +1006,11 @@ class FileProcessingService:
         except Exception as e:
             logger.error(f"Error processing PDF: {str(e)}")
             raise HTTPException(status_code=500, detail="Error processing PDF file")
-    
-    async def _process_docx(self, file_bytes: bytes) -> str:
-        """Extract text from DOCX file bytes"""
+
+    def _process_docx(self, file_obj) -> str:
+        """Extract text from a DOCX file object"""
         try:
-            docx_file = BytesIO(file_bytes)
-            doc = docx.Document(docx_file)
+            doc = docx.Document(file_obj)
             text = ""
             for paragraph in doc.paragraphs:
                 text += paragraph.text + "\n"
@@ -598,9 +1022,292 @@ class FileProcessingService:
 # Initialize services
 llm_service = LLMService()
 file_service = FileProcessingService()
-
-# Initialize FastAPI app
-app = FastAPI()
+chat_sessions_store = ChatSessionStore(os.getenv("REDIS_URL"))
+
+# Short-lived cache for hot read endpoints (portfolio views, interview
+# polling). Entries are dropped explicitly whenever the underlying row is
+# written, so the TTL only bounds staleness across processes.
+read_cache: TTLCache = TTLCache(maxsize=1024, ttl=30)
+
+# TTLCache is not thread-safe, and background jobs invalidate entries from
+# executor/arq worker threads while handlers read and write on the event
+# loop, so all access goes through these lock-guarded helpers
+_read_cache_lock = threading.Lock()
+
+def read_cache_get(key: str):
+    with _read_cache_lock:
+        return read_cache.get(key)
+
+def read_cache_set(key: str, value) -> None:
+    with _read_cache_lock:
+        read_cache[key] = value
+
+def read_cache_pop(key: str) -> None:
+    with _read_cache_lock:
+        read_cache.pop(key, None)
+
+# Per-session locks serializing chat turns within this process. Held in a
+# TTL cache spanning the session store's lifetime, so abandoned sessions and
+# posts with bogus ids cannot grow the map for the life of the process;
+# completed and unknown sessions are still dropped eagerly. Only touched
+# from the event loop, so no thread lock is needed here.
+_session_locks: TTLCache = TTLCache(maxsize=4096, ttl=ChatSessionStore.TTL_SECONDS)
+
+def _session_lock(session_id: str) -> asyncio.Lock:
+    """Get or create the turn lock for a chat session"""
+    lock = _session_locks.get(session_id)
+    if lock is None:
+        lock = _session_locks[session_id] = asyncio.Lock()
+    return lock
+
+# Result cache for LLM calls whose output is a pure function of their input
+# (interview feedback). Shared through Redis when REDIS_URL is set so every
+# worker benefits; otherwise a process-local TTL cache
+LLM_CACHE_TTL = 86400
+_llm_cache_redis = (
+    redis.asyncio.Redis.from_url(os.environ["REDIS_URL"], decode_responses=True, max_connections=10)
+    if os.getenv("REDIS_URL") else None
+)
+_llm_cache_local: TTLCache = TTLCache(maxsize=256, ttl=LLM_CACHE_TTL)
+
+async def llm_cache_get(key: str) -> Optional[str]:
+    if _llm_cache_redis is not None:
+        return await _llm_cache_redis.get(f"llmcache:{key}")
+    return _llm_cache_local.get(key)
+
+async def llm_cache_set(key: str, value: str) -> None:
+    if _llm_cache_redis is not None:
+        await _llm_cache_redis.set(f"llmcache:{key}", value, ex=LLM_CACHE_TTL)
+    else:
+        _llm_cache_local[key] = value
+
+def invalidate_portfolio_cache(portfolio_id: str):
+    """Drop cached reads for a portfolio after its row is written."""
+    read_cache_pop(f"portfolio:{portfolio_id}")
+    read_cache_pop(f"portfolio_export:{portfolio_id}")
+
+# Job description and resume rows are effectively immutable once written, so
+# repeat lookups — retried generations, or a cover letter and career guide
+# for the same jd/resume pair — can skip the round-trip for a while. Like
+# read_cache, this TTLCache is touched from both the event loop and the
+# resume job's worker thread, so access is lock-guarded.
+_row_cache: TTLCache = TTLCache(maxsize=1024, ttl=300)
+_row_cache_lock = threading.Lock()
+
+def row_cache_get(key: str):
+    with _row_cache_lock:
+        return _row_cache.get(key)
+
+def row_cache_set(key: str, value) -> None:
+    with _row_cache_lock:
+        _row_cache[key] = value
+
+def row_cache_pop(key: str) -> None:
+    with _row_cache_lock:
+        _row_cache.pop(key, None)
+
+async def get_jd_row(jd_id: str) -> Optional[dict]:
+    """Fetch a job_descriptions row by id through the row cache"""
+    key = f"jd:{jd_id}"
+    row = row_cache_get(key)
+    if row is None:
+        row = await db_select("job_descriptions", {"id": jd_id}, single=True)
+        if row is not None:
+            row_cache_set(key, row)
+    return row
+
+async def get_resume_row(resume_id: str) -> Optional[dict]:
+    """Fetch a resumes row by id through the row cache"""
+    key = f"resume:{resume_id}"
+    row = row_cache_get(key)
+    if row is None:
+        row = await db_select("resumes", {"id": resume_id}, single=True)
+        if row is not None:
+            row_cache_set(key, row)
+    return row
+
+def conditional_json_response(payload, request: Request) -> Response:
+    """
+    Serve a JSON payload with an ETag. Pollers that already hold the current
+    version (If-None-Match) get an empty 304 instead of the full body again.
+    """
+    body = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "private, max-age=30"},
+    )
+
+# ===== BACKGROUND JOB QUEUE =====
+# Module-level job bodies so they can run either on the in-process worker
+# pool or, when REDIS_URL is set, on a separate arq worker process
+# (`arq backend.WorkerSettings`) that adds retries, backpressure and
+# cross-instance scaling and survives restarts of the web process.
+
+# In-flight guard so a double-submitted generation (double click, retry)
+# doesn't run two sets of Groq calls racing to write the same row. Jobs run
+# in sync context, so this uses the blocking Redis client; without
+# REDIS_URL a process-local set covers the single-worker case.
+_job_lock_redis = (
+    redis.Redis.from_url(os.environ["REDIS_URL"], max_connections=10)
+    if os.getenv("REDIS_URL") else None
+)
+_jobs_in_flight: set = set()
+# Executor threads race on the local set, so check-and-add must be atomic
+_jobs_in_flight_lock = threading.Lock()
+
+def acquire_job_lock(key: str, ttl: int = 600) -> bool:
+    """Claim a job slot; False means an identical job is already running"""
+    if _job_lock_redis is not None:
+        return bool(_job_lock_redis.set(f"nx:{key}", 1, nx=True, ex=ttl))
+    with _jobs_in_flight_lock:
+        if key in _jobs_in_flight:
+            return False
+        _jobs_in_flight.add(key)
+        return True
+
+def release_job_lock(key: str) -> None:
+    if _job_lock_redis is not None:
+        _job_lock_redis.delete(f"nx:{key}")
+    else:
+        with _jobs_in_flight_lock:
+            _jobs_in_flight.discard(key)
+
+def process_resume_job(file_bytes: bytes, filename: str, resume_id: str, portfolio_id: str):
+    """Extract resume text, update the resume row and build its portfolio"""
+    try:
+        logger.info(f"[BG] Processing resume for portfolio {portfolio_id} (resume_id={resume_id})")
+        resume_text = file_service.process_file(BytesIO(file_bytes), filename)
+        logger.info(f"[BG] Resume text extracted for portfolio {portfolio_id}")
+
+        # Update resume content
+        update_result = db_update_sync("resumes", {
+            "content": resume_text
+        }, {"id": resume_id})
+        row_cache_pop(f"resume:{resume_id}")
+        if update_result:
+            logger.info(f"[BG] Resume content updated successfully for ID: {resume_id}")
+        else:
+            logger.error(f"[BG] Resume update failed or no record updated for ID: {resume_id}")
+
+        # Then process for portfolio (single LLM call returning
+        # sections + CSS; HTML is rendered from the Jinja template)
+        portfolio_content = llm_service.analyze_and_render_portfolio(resume_text)
+        logger.info(f"[BG] LLM portfolio content for portfolio {portfolio_id}: {portfolio_content}")
+        db_update_sync("portfolios", {
+            "status": PortfolioStatus.COMPLETED,
+            "content": portfolio_content["content"],
+            "html": portfolio_content["html"],
+            "css": portfolio_content["css"]
+        }, {"id": portfolio_id})
+        invalidate_portfolio_cache(portfolio_id)
+        logger.info(f"[BG] Portfolio {portfolio_id} updated to COMPLETED")
+    except Exception as e:
+        logger.error(f"[BG] Error in background processing for portfolio {portfolio_id}: {str(e)}")
+        db_update_sync("portfolios", {
+            "status": PortfolioStatus.ERROR
+        }, {"id": portfolio_id})
+        invalidate_portfolio_cache(portfolio_id)
+        db_update_sync("resumes", {
+            "content": "Error processing resume"
+        }, {"id": resume_id})
+        row_cache_pop(f"resume:{resume_id}")
+
+def process_portfolio_job(portfolio_id: str, resume_content, job_description: Optional[dict]):
+    """Build structured portfolio content and rendered HTML/CSS for a row"""
+    if not acquire_job_lock(f"portfolio:{portfolio_id}"):
+        logger.info(f"Portfolio {portfolio_id} already has a generation job in flight; skipping duplicate")
+        return
+    try:
+        if isinstance(resume_content, dict):
+            # If it's already structured (from chat), use it directly
+            structured_content = resume_content
+        else:
+            # If it's text (from resume), analyze it
+            structured_content = llm_service.analyze_resume(resume_content)
+
+        # If job description is provided, use it to enhance the portfolio
+        if job_description:
+            structured_content = llm_service.enhance_portfolio_with_jd(structured_content, job_description)
+
+        portfolio_content = llm_service.generate_portfolio_content(structured_content)
+        db_update_sync("portfolios", {
+            "status": PortfolioStatus.COMPLETED,
+            "content": structured_content,
+            "html": portfolio_content["html"],
+            "css": portfolio_content["css"]
+        }, {"id": portfolio_id})
+        invalidate_portfolio_cache(portfolio_id)
+    except Exception as e:
+        logger.error(f"Error processing portfolio: {str(e)}")
+        db_update_sync("portfolios", {
+            "status": PortfolioStatus.ERROR
+        }, {"id": portfolio_id})
+        invalidate_portfolio_cache(portfolio_id)
+    finally:
+        release_job_lock(f"portfolio:{portfolio_id}")
+
+def process_optimization_job(jd_content: str, resume_content: str, optimized_resume_id: str):
+    """Optimize a resume against a job description and store the result"""
+    try:
+        # Analyze job description
+        job_analysis = llm_service.analyze_job_description(jd_content)
+        logger.info(f"[BG] Job analysis completed for resume optimization")
+
+        # Optimize resume
+        optimized_content = llm_service.optimize_resume(resume_content, job_analysis)
+        logger.info(f"[BG] Resume optimization completed")
+
+        # Update optimized resume content
+        db_update_sync("optimized_resumes", {
+            "content": optimized_content
+        }, {"id": optimized_resume_id})
+        logger.info(f"[BG] Optimized resume updated successfully")
+    except Exception as e:
+        logger.error(f"[BG] Error in resume optimization: {str(e)}")
+        db_update_sync("optimized_resumes", {
+            "content": "Error optimizing resume"
+        }, {"id": optimized_resume_id})
+
+JOB_FUNCTIONS = {
+    "process_resume": process_resume_job,
+    "process_portfolio": process_portfolio_job,
+    "process_optimization": process_optimization_job,
+}
+
+arq_pool = None
+
+async def submit_job(name: str, *args) -> None:
+    """Enqueue a background job on arq, or fall back to the worker pool"""
+    if arq_pool is not None:
+        await arq_pool.enqueue_job(name, *args)
+    else:
+        background_executor.submit(JOB_FUNCTIONS[name], *args)
+
+# arq task wrappers: the job bodies are synchronous (blocking LLM and
+# Supabase clients), so the worker runs them on a thread
+async def process_resume(ctx, file_bytes, filename, resume_id, portfolio_id):
+    await asyncio.to_thread(process_resume_job, file_bytes, filename, resume_id, portfolio_id)
+
+async def process_portfolio(ctx, portfolio_id, resume_content, job_description):
+    await asyncio.to_thread(process_portfolio_job, portfolio_id, resume_content, job_description)
+
+async def process_optimization(ctx, jd_content, resume_content, optimized_resume_id):
+    await asyncio.to_thread(process_optimization_job, jd_content, resume_content, optimized_resume_id)
+
+class WorkerSettings:
+    """arq worker entry point: run `arq backend.WorkerSettings`"""
+    functions = [process_resume, process_portfolio, process_optimization]
+    redis_settings = RedisSettings.from_dsn(os.environ["REDIS_URL"]) if os.getenv("REDIS_URL") else None
+    job_timeout = 600
+    max_tries = 3
+
+# Initialize FastAPI app; orjson serializes responses several times faster
+# than the stdlib encoder, which matters for the large portfolio payloads
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Configure CORS
 app.add_middleware(
@@ -611,6 +1318,46 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger JSON bodies (portfolio content/html compresses very well);
+# small responses stay uncompressed to avoid the CPU cost for no gain
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+@app.on_event("startup")
+async def init_db_pool():
+    """Open the direct Postgres pool when SUPABASE_DB_URL is configured"""
+    global db_pool
+    if not DB_DSN:
+        logger.info("SUPABASE_DB_URL not set; reads go through PostgREST")
+        return
+    db_pool = await asyncpg.create_pool(
+        DB_DSN,
+        min_size=5,
+        max_size=20,
+        command_timeout=30,
+        max_inactive_connection_lifetime=300,
+        # Supabase's connection pooler doesn't support prepared statements
+        statement_cache_size=0,
+        init=_init_pg_connection,
+    )
+    logger.info("Direct Postgres pool initialized for read queries")
+
+@app.on_event("startup")
+async def init_job_queue():
+    """Connect to the arq queue when REDIS_URL is configured"""
+    global arq_pool
+    if not os.getenv("REDIS_URL"):
+        logger.info("REDIS_URL not set; background jobs run on the in-process worker pool")
+        return
+    arq_pool = await create_pool(RedisSettings.from_dsn(os.environ["REDIS_URL"]))
+    logger.info("Background jobs enqueued to arq")
+
+@app.on_event("shutdown")
+async def close_db_pool():
+    if db_pool is not None:
+        await db_pool.close()
+    if arq_pool is not None:
+        await arq_pool.close()
+
 # ===== API ROUTES START =====
 # All API routes must be defined BEFORE mounting static files
 
@@ -619,12 +1366,12 @@ async def test_db():
     """Test endpoint to verify database connectivity"""
     try:
         # Try to query a simple table
-        result = supabase.table("job_descriptions").select("count").limit(1).execute()
+        await db_select("job_descriptions", columns="id", limit=1)
         logger.info("Database connection test successful")
         return {
             "status": "ok",
             "message": "Database connection successful",
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": utc_now().isoformat()
         }
     except Exception as e:
         logger.error(f"Database connection test failed: {str(e)}")
@@ -637,13 +1384,12 @@ async def test_api():
     return {
         "status": "ok",
         "message": "API is working",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": utc_now().isoformat(),
         "environment": os.getenv("ENVIRONMENT", "development")
     }
 
 @app.post("/api/portfolios/resume", response_model=Dict[str, str])
 async def create_portfolio_from_resume(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     user_id: str = Query(..., description="User ID"),
     title: str = Query(..., description="Portfolio title"),
@@ -657,17 +1403,15 @@ async def create_portfolio_from_resume(
         if not file.filename.lower().endswith(('.pdf', '.doc', '.docx')):
             raise HTTPException(status_code=400, detail="Only PDF and DOCX files are supported")
 
-        # First create a resume record
-        resume = Resume(
+        # Create the resume and portfolio records together. Fields here come
+        # from already-validated request data, so model_construct skips a
+        # second round of per-field validation (same for the other internal
+        # row models below).
+        resume = Resume.model_construct(
             user_id=user_id,
             content=""  # Will be updated in background task
         )
-        resume_data = convert_datetimes_to_iso(resume.model_dump())
-        resume_result = supabase.table("resumes").insert(resume_data).execute()
-        logger.info(f"Created resume record with ID: {resume.id}")
-
-        # Then create portfolio record
-        portfolio = Portfolio(
+        portfolio = Portfolio.model_construct(
             user_id=user_id,
             title=title,
             method=PortfolioMethod.RESUME,
@@ -675,64 +1419,32 @@ async def create_portfolio_from_resume(
             resume_id=resume.id,  # Link to the resume
             job_description_id=job_description_id  # Optional job description ID
         )
-        portfolio_data = portfolio.model_dump(mode="json")
-        result = supabase.table("portfolios").insert(portfolio_data).execute()
-        logger.info(f"Inserted new portfolio row: {portfolio_data}")
-        
-        file_bytes = await file.read()  # Read file contents before background task
+        # Both inserts run in one transaction via the
+        # create_portfolio_with_resume function (see migrations.sql), so the
+        # request pays a single round-trip instead of two
+        await db_rpc("create_portfolio_with_resume", {
+            "resume_row": model_to_row(resume),
+            "portfolio_row": model_to_row(portfolio)
+        })
+        logger.info(f"Inserted resume {resume.id} and portfolio {portfolio.id}")
+
+        # Copy the upload in chunks before the background task; the UploadFile
+        # is closed once the response is sent, and chunked reads avoid holding
+        # both a bytes blob and a BytesIO copy of the whole file
+        file_buffer = BytesIO()
+        while chunk := await file.read(65536):
+            file_buffer.write(chunk)
         filename = file.filename
-        
-        def process_resume_sync(file_bytes, filename, resume_id):
-            try:
-                logger.info(f"[BG] Processing resume for portfolio {portfolio.id} (resume_id={resume_id})")
-                import asyncio
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                resume_text = loop.run_until_complete(file_service.process_file_bytes(file_bytes, filename))
-                logger.info(f"[BG] Resume text extracted for portfolio {portfolio.id}")
-
-                # Update resume content
-                update_result = supabase.table("resumes").update({
-                    "content": resume_text,
-                    "updated_at": datetime.utcnow().isoformat()
-                }).eq("id", resume_id).execute()
-                logger.info(f"[BG] Resume update result for ID {resume_id}: {update_result}")
-                if hasattr(update_result, 'data') and update_result.data:
-                    logger.info(f"[BG] Resume content updated successfully for ID: {resume_id}")
-                else:
-                    logger.error(f"[BG] Resume update failed or no record updated for ID: {resume_id}")
-
-                # Then process for portfolio
-                structured_content = llm_service.analyze_resume(resume_text)
-                logger.info(f"[BG] LLM structured content for portfolio {portfolio.id}: {structured_content}")
-                portfolio_content = llm_service.generate_portfolio_content(structured_content)
-                logger.info(f"[BG] LLM HTML/CSS for portfolio {portfolio.id}: {portfolio_content}")
-                supabase.table("portfolios").update({
-                    "status": PortfolioStatus.COMPLETED,
-                    "content": structured_content,
-                    "html": portfolio_content["html"],
-                    "css": portfolio_content["css"],
-                    "updated_at": datetime.utcnow().isoformat()
-                }).eq("id", portfolio.id).execute()
-                logger.info(f"[BG] Portfolio {portfolio.id} updated to COMPLETED")
-            except Exception as e:
-                logger.error(f"[BG] Error in background processing for portfolio {portfolio.id}: {str(e)}")
-                supabase.table("portfolios").update({
-                    "status": PortfolioStatus.ERROR,
-                    "updated_at": datetime.utcnow().isoformat()
-                }).eq("id", portfolio.id).execute()
-                supabase.table("resumes").update({
-                    "content": "Error processing resume",
-                    "updated_at": datetime.utcnow().isoformat()
-                }).eq("id", resume_id).execute()
-        
-        background_tasks.add_task(process_resume_sync, file_bytes, filename, resume.id)
+
+        await submit_job("process_resume", file_buffer.getvalue(), filename, resume.id, portfolio.id)
         return {
             "portfolio_id": portfolio.id,
             "resume_id": resume.id,
             "status": "processing",
             "view_url": f"/portfolio/{portfolio.id}"
         }
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Error creating portfolio: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -744,8 +1456,8 @@ async def start_chat(request: ChatStartRequest):
     """
     try:
         # Create chat session
-        first_question = "What is your full name?"
-        chat_session = ChatSession(
+        first_question = CHAT_QUESTIONS[0]
+        chat_session = ChatSession.model_construct(
             user_id=request.user_id,
             title=request.title,
             current_question=first_question,
@@ -753,35 +1465,25 @@ async def start_chat(request: ChatStartRequest):
         )
         
         # Save to database
-        chat_data = chat_session.model_dump(mode="json")
-        result = supabase.table("chat_sessions").insert(chat_data).execute()
-        
-        if not result.data:
+        result = await db_insert("chat_sessions", model_to_json(chat_session))
+
+        if not result:
             raise HTTPException(status_code=500, detail="Failed to create chat session")
-            
-        # Store in-memory session state
-        chat_sessions_store[chat_session.id] = {
-            "questions": [
-                "What is your full name?",
-                "What is your most recent job title?",
-                "List your top skills.",
-                "Describe your work experience.",
-                "List your projects.",
-                "List your education qualifications"
-            ],
+
+        # Store in-flight session state
+        await chat_sessions_store.set(chat_session.id, {
             "answers": [],
             "current": 0
-        }
-        
+        })
+
         # Save initial welcome message
-        welcome_message = ChatMessage(
+        welcome_message = ChatMessage.model_construct(
             chat_session_id=chat_session.id,
             content=first_question,
             role="assistant"
         )
-        message_data = welcome_message.model_dump(mode="json")
-        supabase.table("chat_messages").insert(message_data).execute()
-        
+        await db_insert("chat_messages", model_to_json(welcome_message))
+
         logger.info(f"Started chat session {chat_session.id} for user {request.user_id}")
         return {
             "chat_session_id": chat_session.id,
@@ -792,137 +1494,192 @@ async def start_chat(request: ChatStartRequest):
         logger.error(f"Error starting chat session: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _persist_chat_turn(chat_session_id: str, messages: List[ChatMessage],
+                             session_update: Optional[Dict[str, Any]] = None):
+    """
+    Persist a chat turn's messages and an optional session update together.
+
+    With the direct pool this is a single transaction (one network
+    round-trip); on PostgREST it is one bulk message insert plus at most one
+    session update instead of a write per row.
+    """
+    read_cache_pop(f"chat_messages:{chat_session_id}")
+    if db_pool is not None:
+        async with db_pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.executemany(
+                    "INSERT INTO chat_messages (id, chat_session_id, content, role, created_at) "
+                    "VALUES ($1, $2, $3, $4, $5)",
+                    [(m.id, m.chat_session_id, m.content, m.role, m.created_at) for m in messages],
+                )
+                if session_update:
+                    set_clauses = []
+                    args = [chat_session_id]
+                    for column, value in session_update.items():
+                        args.append(value)
+                        set_clauses.append(f"{column} = ${len(args)}")
+                    await conn.execute(
+                        f"UPDATE chat_sessions SET {', '.join(set_clauses)} WHERE id = $1",
+                        *args,
+                    )
+        return
+    await db_insert("chat_messages", _adapter_for(List[ChatMessage]).dump_json(messages))
+    if session_update:
+        await db_update("chat_sessions", session_update, {"id": chat_session_id})
+
 @app.post("/api/chat/message", response_model=Dict[str, str])
 async def send_chat_message(request: ChatMessageRequest):
     """
     Send a message in a chat session and get the next question or completion
     """
     try:
-        # Get chat session
-        session_result = supabase.table("chat_sessions").select("*").eq("id", request.chat_session_id).single().execute()
-        if not session_result.data:
-            raise HTTPException(status_code=404, detail="Chat session not found")
-            
-        session = chat_sessions_store.get(request.chat_session_id)
-        if not session:
-            raise HTTPException(status_code=404, detail="Chat session not found")
-            
-        # Save user's message
-        user_message = ChatMessage(
-            chat_session_id=request.chat_session_id,
-            content=request.content,
-            role="user"
-        )
-        message_data = user_message.model_dump(mode="json")
-        supabase.table("chat_messages").insert(message_data).execute()
-        
-        # Process the answer
-        session["answers"].append(request.content)
-        session["current"] += 1
-        
-        if session["current"] < len(session["questions"]):
-            # Get next question
-            next_question = session["questions"][session["current"]]
+        # Serialize turns per session: two concurrent posts must not both
+        # read the same "current" index and double-write a turn
+        async with _session_lock(request.chat_session_id):
+            # The session store is authoritative for in-flight sessions, so a
+            # miss means the session is unknown or already completed — no need
+            # to double-check the chat_sessions row first
+            session = await chat_sessions_store.get(request.chat_session_id)
+            if not session:
+                # Don't leave a lock entry behind for an id that has no
+                # session; any coroutine already waiting on it still holds
+                # the same object and will take this path too
+                _session_locks.pop(request.chat_session_id, None)
+                raise HTTPException(status_code=404, detail="Chat session not found")
             
-            # Save assistant's message
-            assistant_message = ChatMessage(
+            # Build the user's message; it is written together with the rest of
+            # the turn below
+            user_message = ChatMessage.model_construct(
                 chat_session_id=request.chat_session_id,
-                content=next_question,
-                role="assistant"
+                content=request.content,
+                role="user"
             )
-            message_data = assistant_message.model_dump(mode="json")
-            supabase.table("chat_messages").insert(message_data).execute()
-            
-            # Update session status
-            supabase.table("chat_sessions").update({
-                "current_question": next_question,
-                "updated_at": datetime.utcnow().isoformat()
-            }).eq("id", request.chat_session_id).execute()
+
+            # Process the answer
+            session["answers"].append(request.content)
+            session["current"] += 1
+            await chat_sessions_store.set(request.chat_session_id, session)
+
+            if session["current"] < len(CHAT_QUESTIONS):
+                # Get next question
+                next_question = CHAT_QUESTIONS[session["current"]]
             
-            return {
-                "chat_session_id": request.chat_session_id,
-                "next_question": next_question,
-                "status": "in_progress"
-            }
-        else:
-            # All questions answered, generate portfolio
-            logger.info(f"All questions answered for chat session {request.chat_session_id}")
+                # Save both messages; current_question is write-back cached in
+                # the session store and only flushed to the database when the
+                # session finishes
+                assistant_message = ChatMessage.model_construct(
+                    chat_session_id=request.chat_session_id,
+                    content=next_question,
+                    role="assistant"
+                )
+                await _persist_chat_turn(
+                    request.chat_session_id,
+                    [user_message, assistant_message]
+                )
+
+                return {
+                    "chat_session_id": request.chat_session_id,
+                    "next_question": next_question,
+                    "status": "in_progress"
+                }
+            else:
+                # All questions answered, generate portfolio
+                logger.info(f"All questions answered for chat session {request.chat_session_id}")
             
-            # Parse chat answers into structured data
-            answers = session["answers"]
-            structured = {
-                "Name": answers[0] if len(answers) > 0 else "",
-                "About Me": answers[0] if len(answers) > 0 else "",
-                "Work Experience": [],
-                "Skills": [],
-                "Projects": [],
-                "Education": []
-            }
+                # Parse chat answers into structured data
+                answers = session["answers"]
+                structured = {
+                    "Name": answers[0] if len(answers) > 0 else "",
+                    "About Me": answers[0] if len(answers) > 0 else "",
+                    "Work Experience": [],
+                    "Skills": [],
+                    "Projects": [],
+                    "Education": []
+                }
             
-            # Parse answers into structured data (same as before)
-            if len(answers) > 1 and answers[1].strip():
-                work_exp = []
-                for item in answers[1].split(';'):
-                    parts = [p.strip() for p in item.split('|')]
-                    if len(parts) >= 3:
-                        work_exp.append({
-                            "Company": parts[0],
-                            "Designation": parts[1],
-                            "Duration": parts[2],
-                            "Description": parts[3] if len(parts) > 3 else ""
-                        })
-                structured["Work Experience"] = work_exp
+                # Parse answers into structured data (same as before)
+                if len(answers) > 1 and answers[1].strip():
+                    work_exp = []
+                    for item in answers[1].split(';'):
+                        parts = list(map(str.strip, item.split('|')))
+                        if len(parts) >= 3:
+                            work_exp.append({
+                                "Company": parts[0],
+                                "Designation": parts[1],
+                                "Duration": parts[2],
+                                "Description": parts[3] if len(parts) > 3 else ""
+                            })
+                    structured["Work Experience"] = work_exp
                 
-            if len(answers) > 2 and answers[2].strip():
-                skills = [s.strip() for s in re.split(r'[\n,]', answers[2]) if s.strip()]
-                structured["Skills"] = skills
+                if len(answers) > 2 and answers[2].strip():
+                    skills = [s.strip() for s in _SKILL_SPLIT.split(answers[2]) if s.strip()]
+                    structured["Skills"] = skills
                 
-            if len(answers) > 3 and answers[3].strip():
-                projects = []
-                for item in answers[3].split(';'):
-                    parts = [p.strip() for p in item.split('|')]
-                    if len(parts) >= 1:
-                        projects.append({
-                            "Name": parts[0],
-                            "Description": parts[1] if len(parts) > 1 else ""
-                        })
-                structured["Projects"] = projects
+                if len(answers) > 3 and answers[3].strip():
+                    projects = []
+                    for item in answers[3].split(';'):
+                        parts = list(map(str.strip, item.split('|')))
+                        if len(parts) >= 1:
+                            projects.append({
+                                "Name": parts[0],
+                                "Description": parts[1] if len(parts) > 1 else ""
+                            })
+                    structured["Projects"] = projects
                 
-            if len(answers) > 4 and answers[4].strip():
-                education = []
-                for item in answers[4].split(';'):
-                    parts = [p.strip() for p in item.split('|')]
-                    if len(parts) >= 1:
-                        education.append({
-                            "Degree": parts[0],
-                            "Institution": parts[1] if len(parts) > 1 else "",
-                            "Board": parts[2] if len(parts) > 2 else "",
-                            "Description": parts[3] if len(parts) > 3 else ""
-                        })
-                structured["Education"] = education
-            
-            # Update session status to completed
-            supabase.table("chat_sessions").update({
-                "status": PortfolioStatus.COMPLETED,
-                "updated_at": datetime.utcnow().isoformat()
-            }).eq("id", request.chat_session_id).execute()
+                if len(answers) > 4 and answers[4].strip():
+                    education = []
+                    for item in answers[4].split(';'):
+                        parts = list(map(str.strip, item.split('|')))
+                        if len(parts) >= 1:
+                            education.append({
+                                "Degree": parts[0],
+                                "Institution": parts[1] if len(parts) > 1 else "",
+                                "Board": parts[2] if len(parts) > 2 else "",
+                                "Description": parts[3] if len(parts) > 3 else ""
+                            })
+                    structured["Education"] = education
             
-            return {
-                "chat_session_id": request.chat_session_id,
-                "status": "completed",
-                "structured_data": structured,
-                "message": "Chat session completed. Profile information saved."
-            }
+                # Persist the final answer plus the structured profile (as the
+                # closing assistant message, which the portfolio generator reads
+                # back) and flush the write-back cached session state, all in one
+                # batched write
+                structured_message = ChatMessage.model_construct(
+                    chat_session_id=request.chat_session_id,
+                    content=json.dumps(structured),
+                    role="assistant"
+                )
+                await _persist_chat_turn(
+                    request.chat_session_id,
+                    [user_message, structured_message],
+                    {
+                        "status": PortfolioStatus.COMPLETED,
+                        "current_question": CHAT_QUESTIONS[-1]
+                    }
+                )
+                await chat_sessions_store.delete(request.chat_session_id)
+                _session_locks.pop(request.chat_session_id, None)
+
+                return {
+                    "chat_session_id": request.chat_session_id,
+                    "status": "completed",
+                    "structured_data": structured,
+                    "message": "Chat session completed. Profile information saved."
+                }
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Error in chat message: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/chat/sessions/{user_id}", response_model=List[ChatSession])
-async def get_chat_sessions(user_id: str):
-    """Get all chat sessions for a user"""
+@app.get("/api/chat/sessions/{user_id}", response_model=List[ChatSessionSummary])
+async def get_chat_sessions(user_id: str, limit: int = Query(50, ge=1, le=200), offset: int = Query(0, ge=0)):
+    """Get chat sessions for a user, newest first"""
     try:
-        result = supabase.table("chat_sessions").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
-        return result.data
+        return await db_select(
+            "chat_sessions", {"user_id": user_id},
+            columns="id,user_id,title,status,created_at,updated_at",
+            order="created_at", desc=True, limit=limit, offset=offset
+        )
     except Exception as e:
         logger.error(f"Error fetching chat sessions: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -931,8 +1688,13 @@ async def get_chat_sessions(user_id: str):
 async def get_chat_messages(chat_session_id: str):
     """Get all messages for a chat session"""
     try:
-        result = supabase.table("chat_messages").select("*").eq("chat_session_id", chat_session_id).order("created_at", asc=True).execute()
-        return result.data
+        cache_key = f"chat_messages:{chat_session_id}"
+        cached = read_cache_get(cache_key)
+        if cached is not None:
+            return cached
+        result = await db_select("chat_messages", {"chat_session_id": chat_session_id}, order="created_at")
+        read_cache_set(cache_key, result)
+        return result
     except Exception as e:
         logger.error(f"Error fetching chat messages: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -943,20 +1705,30 @@ async def get_portfolio(portfolio_id: str):
     Get portfolio details by ID
     """
     try:
-        result = supabase.table("portfolios").select("*").eq("id", portfolio_id).single().execute()
-        if not result.data:
+        cache_key = f"portfolio:{portfolio_id}"
+        cached = read_cache_get(cache_key)
+        if cached is not None:
+            return cached
+        result = await db_select("portfolios", {"id": portfolio_id}, single=True)
+        if not result:
             raise HTTPException(status_code=404, detail="Portfolio not found")
-        return result.data
+        read_cache_set(cache_key, result)
+        return result
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Error fetching portfolio: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/portfolios/user/{user_id}", response_model=List[Portfolio])
-async def get_user_portfolios(user_id: str):
-    """Get all portfolios for a user"""
+@app.get("/api/portfolios/user/{user_id}", response_model=List[PortfolioSummary])
+async def get_user_portfolios(user_id: str, limit: int = Query(50, ge=1, le=200), offset: int = Query(0, ge=0)):
+    """Get portfolios for a user, newest first"""
     try:
-        result = supabase.table("portfolios").select("*").eq("user_id", user_id).execute()
-        return result.data
+        return await db_select(
+            "portfolios", {"user_id": user_id},
+            columns="id,user_id,title,method,status,created_at,updated_at",
+            order="created_at", desc=True, limit=limit, offset=offset
+        )
     except Exception as e:
         logger.error(f"Error fetching user portfolios: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -967,23 +1739,39 @@ async def export_portfolio(portfolio_id: str):
     Export portfolio HTML and CSS
     """
     try:
-        result = supabase.table("portfolios").select("html, css").eq("id", portfolio_id).execute()
-        if not result.data:
+        cache_key = f"portfolio_export:{portfolio_id}"
+        cached = read_cache_get(cache_key)
+        if cached is not None:
+            return cached
+        result = await db_select("portfolios", {"id": portfolio_id}, columns="html,css")
+        if not result:
             raise HTTPException(status_code=404, detail="Portfolio not found")
-        return {
-            "html": result.data[0]["html"],
-            "css": result.data[0]["css"]
+        html = result[0]["html"] or ""
+        # html_b64 is precomputed so clients building a data: URI (the
+        # Streamlit view link) don't each re-encode the page themselves;
+        # it is cached along with the raw forms
+        export = {
+            "html": html,
+            "html_b64": base64.b64encode(html.encode()).decode(),
+            "css": result[0]["css"]
         }
+        read_cache_set(cache_key, export)
+        return export
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Error exporting portfolio: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/resumes/{user_id}", response_model=List[OptimizedResume])
-async def get_resumes(user_id: str):
+async def get_resumes(user_id: str, limit: int = Query(50, ge=1, le=200), offset: int = Query(0, ge=0)):
     logger.info(f"Fetching resumes for user: {user_id}")
     try:
-        result = supabase.table("optimized_resumes").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
-        return result.data
+        return await db_select(
+            "optimized_resumes", {"user_id": user_id},
+            columns="id,user_id,job_description_id,original_resume_id,content,created_at,updated_at",
+            order="created_at", desc=True, limit=limit, offset=offset
+        )
     except Exception as e:
         logger.error(f"Error fetching resumes: {str(e)}")
         raise HTTPException(status_code=500, detail="Error fetching resumes")
@@ -993,82 +1781,57 @@ async def get_resumes(user_id: str):
 async def create_job_description(request: JobDescriptionCreate):
     """Create a new job description"""
     try:
-        job_description = JobDescription(
+        job_description = JobDescription.model_construct(
             user_id=request.user_id,
             title=request.title,
             content=request.content
         )
-        # Convert datetimes to ISO strings before inserting
-        job_desc_data = convert_datetimes_to_iso(job_description.model_dump())
-        result = supabase.table("job_descriptions").insert(job_desc_data).execute()
-        return result.data[0]
+        result = await db_insert("job_descriptions", model_to_json(job_description))
+        return result[0]
     except Exception as e:
         logger.error(f"Error creating job description: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/job-descriptions/{user_id}", response_model=List[JobDescription])
-async def get_job_descriptions(user_id: str):
+async def get_job_descriptions(user_id: str, limit: int = Query(50, ge=1, le=200), offset: int = Query(0, ge=0)):
     logger.info(f"Fetching job descriptions for user: {user_id}")
     try:
-        result = supabase.table("job_descriptions").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
-        return result.data
+        return await db_select(
+            "job_descriptions", {"user_id": user_id},
+            columns="id,user_id,title,content,created_at,updated_at",
+            order="created_at", desc=True, limit=limit, offset=offset
+        )
     except Exception as e:
         logger.error(f"Error fetching job descriptions: {str(e)}")
         raise HTTPException(status_code=500, detail="Error fetching job descriptions")
 
 # Resume Optimization Endpoints
 @app.post("/api/resumes/optimize", response_model=OptimizedResume)
-async def optimize_resume(request: ResumeOptimizeRequest, background_tasks: BackgroundTasks):
+async def optimize_resume(request: ResumeOptimizeRequest):
     """Optimize a resume based on job description"""
     try:
         # Get job description and original resume
-        jd_result = supabase.table("job_descriptions").select("*").eq("id", request.job_description_id).execute()
-        resume_result = supabase.table("resumes").select("*").eq("id", request.resume_id).execute()
-        
-        if not jd_result.data:
+        job_description, resume = await asyncio.gather(
+            get_jd_row(request.job_description_id),
+            get_resume_row(request.resume_id)
+        )
+
+        if not job_description:
             raise HTTPException(status_code=404, detail=f"Job description with ID {request.job_description_id} not found")
-        if not resume_result.data:
+        if not resume:
             raise HTTPException(status_code=404, detail=f"Resume with ID {request.resume_id} not found")
-        
-        # Get the first (and should be only) result
-        job_description = jd_result.data[0]
-        resume = resume_result.data[0]
-        
+
         # Create optimized resume record
-        optimized_resume = OptimizedResume(
+        optimized_resume = OptimizedResume.model_construct(
             user_id=request.user_id,
             job_description_id=request.job_description_id,
             original_resume_id=request.resume_id,
             content=""  # Will be updated in background task
         )
-        opt_resume_data = convert_datetimes_to_iso(optimized_resume.model_dump())
-        result = supabase.table("optimized_resumes").insert(opt_resume_data).execute()
-        
-        def process_optimization_sync():
-            try:
-                # Analyze job description
-                job_analysis = llm_service.analyze_job_description(job_description["content"])
-                logger.info(f"[BG] Job analysis completed for resume optimization")
-                
-                # Optimize resume
-                optimized_content = llm_service.optimize_resume(resume["content"], job_analysis)
-                logger.info(f"[BG] Resume optimization completed")
-                
-                # Update optimized resume content
-                supabase.table("optimized_resumes").update({
-                    "content": optimized_content,
-                    "updated_at": datetime.utcnow().isoformat()
-                }).eq("id", optimized_resume.id).execute()
-                logger.info(f"[BG] Optimized resume updated successfully")
-            except Exception as e:
-                logger.error(f"[BG] Error in resume optimization: {str(e)}")
-                supabase.table("optimized_resumes").update({
-                    "content": "Error optimizing resume",
-                    "updated_at": datetime.utcnow().isoformat()
-                }).eq("id", optimized_resume.id).execute()
-        
-        background_tasks.add_task(process_optimization_sync)
-        return result.data[0]
+        result = await db_insert("optimized_resumes", model_to_json(optimized_resume))
+
+        await submit_job("process_optimization", job_description["content"], resume["content"], optimized_resume.id)
+        return result[0]
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -1081,34 +1844,44 @@ async def generate_cover_letter(request: CoverLetterGenerateRequest):
     """Generate a cover letter based on job description and resume"""
     try:
         # Get job description and resume
-        jd_result = supabase.table("job_descriptions").select("*").eq("id", request.job_description_id).execute()
-        resume_result = supabase.table("resumes").select("*").eq("id", request.resume_id).execute()
-        
-        if not jd_result.data:
+        job_description, resume = await asyncio.gather(
+            get_jd_row(request.job_description_id),
+            get_resume_row(request.resume_id)
+        )
+
+        if not job_description:
             raise HTTPException(status_code=404, detail=f"Job description with ID {request.job_description_id} not found")
-        if not resume_result.data:
+        if not resume:
             raise HTTPException(status_code=404, detail=f"Resume with ID {request.resume_id} not found")
-        
-        # Get the first (and should be only) result
-        job_description = jd_result.data[0]
-        resume = resume_result.data[0]
-        
-        # Generate cover letter
-        cover_letter_content = llm_service.generate_cover_letter(
-            job_description["content"],
-            resume["content"]
-        )
-        
-        # Create cover letter record
-        cover_letter = CoverLetter(
+
+        # Create cover letter record; content is filled in by the background
+        # worker so the request returns without waiting on the LLM
+        cover_letter = CoverLetter.model_construct(
             user_id=request.user_id,
             job_description_id=request.job_description_id,
             resume_id=request.resume_id,
-            content=cover_letter_content
+            content=""  # Will be updated in background task
         )
-        cover_letter_data = convert_datetimes_to_iso(cover_letter.model_dump())
-        result = supabase.table("cover_letters").insert(cover_letter_data).execute()
-        return result.data[0]
+        result = await db_insert("cover_letters", model_to_json(cover_letter))
+
+        def process_cover_letter_sync():
+            try:
+                cover_letter_content = llm_service.generate_cover_letter(
+                    job_description["content"],
+                    resume["content"]
+                )
+                logger.info(f"[BG] Cover letter generation completed")
+                db_update_sync("cover_letters", {
+                    "content": cover_letter_content
+                }, {"id": cover_letter.id})
+            except Exception as e:
+                logger.error(f"[BG] Error generating cover letter: {str(e)}")
+                db_update_sync("cover_letters", {
+                    "content": "Error generating cover letter"
+                }, {"id": cover_letter.id})
+
+        background_executor.submit(process_cover_letter_sync)
+        return result[0]
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -1116,11 +1889,14 @@ async def generate_cover_letter(request: CoverLetterGenerateRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/cover-letters/{user_id}", response_model=List[CoverLetter])
-async def get_cover_letters(user_id: str):
+async def get_cover_letters(user_id: str, limit: int = Query(50, ge=1, le=200), offset: int = Query(0, ge=0)):
     logger.info(f"Fetching cover letters for user: {user_id}")
     try:
-        result = supabase.table("cover_letters").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
-        return result.data
+        return await db_select(
+            "cover_letters", {"user_id": user_id},
+            columns="id,user_id,job_description_id,resume_id,content,created_at,updated_at",
+            order="created_at", desc=True, limit=limit, offset=offset
+        )
     except Exception as e:
         logger.error(f"Error fetching cover letters: {str(e)}")
         raise HTTPException(status_code=500, detail="Error fetching cover letters")
@@ -1131,15 +1907,14 @@ async def start_interview(request: InterviewStartRequest):
     """Start a new interview session using only the job description to generate questions."""
     try:
         # Get job description
-        jd_result = supabase.table("job_descriptions").select("*").eq("id", request.job_description_id).execute()
-        if not jd_result.data:
+        job_description = await get_jd_row(request.job_description_id)
+        if not job_description:
             raise HTTPException(status_code=404, detail=f"Job description with ID {request.job_description_id} not found")
-        
-        # Get the first (and should be only) result
-        job_description = jd_result.data[0]
-        
+
         # Generate interview questions
-        questions = llm_service.generate_interview_questions(job_description["content"], "mid-level")
+        questions = await asyncio.to_thread(
+            llm_service.generate_interview_questions, job_description["content"], "mid-level"
+        )
         
         # Convert questions to proper format - ensure they are strings
         interview_questions = [
@@ -1148,7 +1923,7 @@ async def start_interview(request: InterviewStartRequest):
         ]
         
         # Create interview session
-        interview_session = InterviewSession(
+        interview_session = InterviewSession.model_construct(
             user_id=request.user_id,
             job_description_id=request.job_description_id,
             questions=interview_questions,
@@ -1156,16 +1931,16 @@ async def start_interview(request: InterviewStartRequest):
         )
         
         # Convert to dict and remove resume_id before inserting
-        session_data = convert_datetimes_to_iso(interview_session.model_dump())
+        session_data = model_to_row(interview_session)
         session_data.pop('resume_id', None)  # Remove resume_id from the data
-        
+
         # Insert into database
-        result = supabase.table("interview_sessions").insert(session_data).execute()
-        
-        if not result.data:
+        result = await db_insert("interview_sessions", session_data)
+
+        if not result:
             raise HTTPException(status_code=500, detail="Failed to create interview session")
-            
-        return result.data[0]
+
+        return result[0]
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -1176,10 +1951,17 @@ async def start_interview(request: InterviewStartRequest):
 async def get_interview(interview_id: str):
     """Get interview session details by ID"""
     try:
-        result = supabase.table("interview_sessions").select("*").eq("id", interview_id).single().execute()
-        if not result.data:
+        cache_key = f"interview:{interview_id}"
+        cached = read_cache_get(cache_key)
+        if cached is not None:
+            return cached
+        result = await db_select("interview_sessions", {"id": interview_id}, single=True)
+        if not result:
             raise HTTPException(status_code=404, detail="Interview session not found")
-        return result.data
+        read_cache_set(cache_key, result)
+        return result
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Error fetching interview session: {str(e)}")
         raise HTTPException(status_code=500, detail="Error fetching interview session")
@@ -1188,90 +1970,71 @@ async def get_interview(interview_id: str):
 async def submit_interview_answer(request: InterviewAnswerRequest):
     """Submit an answer to an interview question"""
     try:
-        # Get interview session
-        session_result = supabase.table("interview_sessions").select("*").eq("id", request.interview_id).single().execute()
-        if not session_result.data:
+        # Record the answer in one atomic round-trip: the RPC locks the
+        # session row, writes the answer with jsonb_set and reports whether
+        # the interview is complete, together with the job title
+        if db_pool is not None:
+            turn = await db_pool.fetchval(
+                "SELECT answer_and_maybe_score($1, $2, $3)",
+                request.interview_id, request.question_index, request.answer
+            )
+        else:
+            turn = await db_rpc("answer_and_maybe_score", {
+                "interview_id": request.interview_id,
+                "idx": request.question_index,
+                "ans": request.answer
+            })
+        read_cache_pop(f"interview:{request.interview_id}")
+
+        if not turn or not turn.get("found"):
             raise HTTPException(status_code=404, detail="Interview session not found")
-        
-        # Update the answer for the specific question
-        questions = session_result.data["questions"]
-        if request.question_index >= len(questions):
+        if not turn.get("valid_index"):
             raise HTTPException(status_code=400, detail="Invalid question index")
-        
-        # Update the answer in the questions list
-        questions[request.question_index]["answer"] = request.answer
-        
-        # Update session with new answer
-        update_result = supabase.table("interview_sessions").update({
-            "questions": questions,
-            "updated_at": datetime.utcnow().isoformat()
-        }).eq("id", request.interview_id).execute()
-        
-        if not update_result.data:
-            raise HTTPException(status_code=500, detail="Failed to update interview session")
-        
+
+        questions = turn["questions"]
+
         # If all questions are answered, calculate score and generate feedback
-        if all(q.get("answer") for q in questions):
+        if turn.get("complete"):
             try:
-                # Get job description to get the job role
-                jd_result = supabase.table("job_descriptions").select("title").eq("id", session_result.data["job_description_id"]).single().execute()
-                if not jd_result.data:
+                job_role = turn.get("job_title")
+                if not job_role:
                     raise HTTPException(status_code=404, detail="Job description not found")
-                job_role = jd_result.data["title"]
 
                 # Get score and feedback from LLM
-                score = llm_service.score_interview([InterviewQuestion(**q) for q in questions])
-                feedback = llm_service.generate_interview_feedback([InterviewQuestion(**q) for q in questions], score)
-                
-                # Create interview score record with feedback and job role
-                interview_score = InterviewScore(
-                    user_id=session_result.data["user_id"],
-                    job_description_id=session_result.data["job_description_id"],
-                    job_role=job_role,
-                    score=score,
-                    feedback=feedback
+                answered_questions = [InterviewQuestion(**q) for q in questions]
+                score = await asyncio.to_thread(llm_service.score_interview, answered_questions)
+                feedback = await asyncio.to_thread(
+                    llm_service.generate_interview_feedback, answered_questions, score
                 )
-                interview_score_data = convert_datetimes_to_iso(interview_score.model_dump())
-                logger.info(f"Attempting to save interview score: {interview_score_data}")
-                
-                # Insert into interview_scores table
-                try:
-                    score_result = supabase.table("interview_scores").insert(interview_score_data).execute()
-                    logger.info(f"Score save result: {score_result.data if score_result.data else 'No data returned'}")
-                    if not score_result.data:
-                        logger.error("Failed to save score - no data returned from insert")
-                        raise Exception("Failed to save score - no data returned from insert")
-                    logger.info(f"Successfully saved interview score with ID: {score_result.data[0]['id']}")
-                except Exception as e:
-                    logger.error(f"Error saving interview score: {str(e)}")
-                    raise HTTPException(status_code=500, detail=f"Failed to save interview score: {str(e)}")
                 
-                # Update the interview session with the score
-                update_score_result = supabase.table("interview_sessions").update({
-                    "score": score,
-                    "updated_at": datetime.utcnow().isoformat()
-                }).eq("id", request.interview_id).execute()
-                
-                if not update_score_result.data:
-                    logger.error("Failed to update interview session with score")
+                # Insert the score row and stamp the session score in one
+                # transaction on the database side
+                if db_pool is not None:
+                    score_id = await db_pool.fetchval(
+                        "SELECT finalize_interview($1, $2, $3, $4)",
+                        request.interview_id, score, feedback, job_role
+                    )
                 else:
-                    logger.info("Successfully updated interview session with score")
-                
-                logger.info(f"Interview scored successfully. Score: {score}, Score ID: {score_result.data[0]['id'] if score_result.data else 'None'}")
-                
-                # Verify the score was saved by immediately fetching it
-                try:
-                    verify_result = supabase.table("interview_scores").select("*").eq("id", score_result.data[0]['id']).single().execute()
-                    logger.info(f"Verification of saved score: {verify_result.data if verify_result.data else 'Not found'}")
-                except Exception as e:
-                    logger.error(f"Error verifying saved score: {str(e)}")
-                
+                    score_id = await db_rpc("finalize_interview", {
+                        "iid": request.interview_id,
+                        "score_value": score,
+                        "feedback_text": feedback,
+                        "role_title": job_role
+                    })
+                read_cache_pop(f"interview:{request.interview_id}")
+
+                if not score_id:
+                    logger.error("Failed to save interview score")
+                    raise HTTPException(status_code=500, detail="Failed to save interview score")
+
+                logger.info(f"Interview scored successfully. Score: {score}, Score ID: {score_id}")
+
                 return {
                     "message": "Interview completed and scored",
                     "score": score,
                     "feedback": feedback,
                     "job_role": job_role,
-                    "score_id": score_result.data[0]["id"] if score_result.data else None
+                    "score_id": score_id
                 }
             except Exception as e:
                 logger.error(f"Error scoring interview: {str(e)}")
@@ -1282,9 +2045,11 @@ async def submit_interview_answer(request: InterviewAnswerRequest):
         
         return {
             "message": "Answer recorded",
-            "questions_answered": sum(1 for q in questions if q.get("answer")),
-            "total_questions": len(questions)
+            "questions_answered": turn["answered"],
+            "total_questions": turn["total"]
         }
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Error submitting interview answer: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error submitting interview answer: {str(e)}")
@@ -1297,42 +2062,46 @@ async def test_interview_scores(user_id: str):
         logger.info(f"User ID: {user_id}")
         
         # Check interview_scores table directly
-        scores_result = supabase.table("interview_scores").select("*").eq("user_id", user_id).execute()
-        logger.info(f"Scores check result: {scores_result.data if scores_result.data else 'No scores found'}")
-        
+        scores_result = await db_select("interview_scores", {"user_id": user_id})
+        logger.info(f"Scores check result: {scores_result if scores_result else 'No scores found'}")
+
         # Return test data
         return {
-            "scores_count": len(scores_result.data) if scores_result.data else 0,
-            "scores": scores_result.data if scores_result.data else [],
-            "timestamp": datetime.utcnow().isoformat()
+            "scores_count": len(scores_result),
+            "scores": scores_result,
+            "timestamp": utc_now().isoformat()
         }
     except Exception as e:
         logger.error(f"Test endpoint error: {str(e)}")
         logger.error(f"Stack trace:", exc_info=True)
         return {
             "error": str(e),
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": utc_now().isoformat()
         }
 
 @app.get("/api/interviews/scores/{user_id}", response_model=List[InterviewScore])
-async def list_interview_scores(user_id: str):
-    """List all interview scores for a user"""
+async def list_interview_scores(user_id: str, limit: int = Query(50, ge=1, le=200), offset: int = Query(0, ge=0)):
+    """List interview scores for a user, newest first"""
     try:
         logger.info(f"=== Starting interview scores fetch ===")
         logger.info(f"Fetching interview scores for user: {user_id}")
-        
+
         # Fetch scores directly from interview_scores table
-        result = supabase.table("interview_scores").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
-        
+        result = await db_select(
+            "interview_scores", {"user_id": user_id},
+            columns="id,user_id,job_description_id,job_role,score,feedback,created_at",
+            order="created_at", desc=True, limit=limit, offset=offset
+        )
+
         # Return empty list if no scores found (this is a valid state)
-        if not result.data:
+        if not result:
             logger.info("No interview scores found for user")
             return []
-            
-        logger.info(f"Found {len(result.data)} interview scores")
-        logger.info(f"First score details: {json.dumps(result.data[0], indent=2)}")
-        
-        return result.data
+
+        logger.info(f"Found {len(result)} interview scores")
+        logger.info(f"First score details: {json.dumps(result[0], indent=2)}")
+
+        return result
     except Exception as e:
         logger.error(f"Error listing interview scores: {str(e)}")
         logger.error(f"Full error details: {type(e).__name__}: {str(e)}")
@@ -1346,34 +2115,44 @@ async def generate_career_guide(request: CareerGuideGenerateRequest):
     """Generate career guidance based on job description and resume"""
     try:
         # Get job description and resume
-        jd_result = supabase.table("job_descriptions").select("*").eq("id", request.job_description_id).execute()
-        resume_result = supabase.table("resumes").select("*").eq("id", request.resume_id).execute()
-        
-        if not jd_result.data:
+        job_description, resume = await asyncio.gather(
+            get_jd_row(request.job_description_id),
+            get_resume_row(request.resume_id)
+        )
+
+        if not job_description:
             raise HTTPException(status_code=404, detail=f"Job description with ID {request.job_description_id} not found")
-        if not resume_result.data:
+        if not resume:
             raise HTTPException(status_code=404, detail=f"Resume with ID {request.resume_id} not found")
-        
-        # Get the first (and should be only) result
-        job_description = jd_result.data[0]
-        resume = resume_result.data[0]
-        
-        # Generate career guide
-        guide_content = llm_service.generate_career_guide(
-            job_description["content"],
-            resume["content"]
-        )
-        
-        # Create career guide record
-        career_guide = CareerGuide(
+
+        # Create career guide record; content is filled in by the background
+        # worker so the request returns without waiting on the LLM
+        career_guide = CareerGuide.model_construct(
             user_id=request.user_id,
             job_description_id=request.job_description_id,
             resume_id=request.resume_id,
-            content=guide_content
+            content=""  # Will be updated in background task
         )
-        career_guide_data = convert_datetimes_to_iso(career_guide.model_dump())
-        result = supabase.table("career_guides").insert(career_guide_data).execute()
-        return result.data[0]
+        result = await db_insert("career_guides", model_to_json(career_guide))
+
+        def process_career_guide_sync():
+            try:
+                guide_content = llm_service.generate_career_guide(
+                    job_description["content"],
+                    resume["content"]
+                )
+                logger.info(f"[BG] Career guide generation completed")
+                db_update_sync("career_guides", {
+                    "content": guide_content
+                }, {"id": career_guide.id})
+            except Exception as e:
+                logger.error(f"[BG] Error generating career guide: {str(e)}")
+                db_update_sync("career_guides", {
+                    "content": "Error generating career guide"
+                }, {"id": career_guide.id})
+
+        background_executor.submit(process_career_guide_sync)
+        return result[0]
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -1381,49 +2160,63 @@ async def generate_career_guide(request: CareerGuideGenerateRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/career-guides/{user_id}", response_model=List[CareerGuide])
-async def list_career_guides(user_id: str):
-    """List all career guides for a user"""
+async def list_career_guides(user_id: str, request: Request, limit: int = Query(50, ge=1, le=200), offset: int = Query(0, ge=0)):
+    """List career guides for a user, newest first"""
     try:
-        result = supabase.table("career_guides").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
-        return result.data
+        guides = await db_select(
+            "career_guides", {"user_id": user_id},
+            columns="id,user_id,job_description_id,resume_id,content,created_at,updated_at",
+            order="created_at", desc=True, limit=limit, offset=offset
+        )
+        return conditional_json_response(guides, request)
     except Exception as e:
         logger.error(f"Error listing career guides: {str(e)}")
         raise HTTPException(status_code=500, detail="Error listing career guides")
 
 @app.post("/api/portfolios/generate", response_model=Portfolio)
-async def generate_portfolio(request: PortfolioGenerateRequest, background_tasks: BackgroundTasks):
+async def generate_portfolio(request: PortfolioGenerateRequest):
     """Generate a portfolio based on job description and resume or chat session"""
     try:
-        # Get job description if provided
+        if not request.resume_id and not request.chat_session_id:
+            raise HTTPException(status_code=400, detail="Either resume_id or chat_session_id must be provided")
+
+        async def fetch_source():
+            """Resume row, or the newest chat message — it carries the structured data"""
+            if request.resume_id:
+                return await get_resume_row(request.resume_id)
+            return await db_select(
+                "chat_messages", {"chat_session_id": request.chat_session_id},
+                columns="content", order="created_at", desc=True, single=True
+            )
+
+        # The JD lookup and the resume/chat lookup are independent, so issue
+        # them concurrently instead of paying two serial round trips
         job_description = None
         if request.job_description_id:
-            jd_result = supabase.table("job_descriptions").select("*").eq("id", request.job_description_id).single().execute()
-            if not jd_result.data:
+            job_description, source = await asyncio.gather(
+                get_jd_row(request.job_description_id), fetch_source()
+            )
+            if not job_description:
                 raise HTTPException(status_code=404, detail="Job description not found")
-            job_description = jd_result.data
-        
-        # Get resume or chat session based on what's provided
-        resume_content = None
+        else:
+            source = await fetch_source()
+
         if request.resume_id:
-            resume_result = supabase.table("resumes").select("*").eq("id", request.resume_id).single().execute()
-            if not resume_result.data:
+            if not source:
                 raise HTTPException(status_code=404, detail="Resume not found")
-            resume_content = resume_result.data["content"]
-        elif request.chat_session_id:
-            chat_result = supabase.table("chat_messages").select("*").eq("chat_session_id", request.chat_session_id).order("created_at").execute()
-            if not chat_result.data:
+            resume_content = source["content"]
+        else:
+            if not source:
                 raise HTTPException(status_code=404, detail="Chat session not found")
-            # Get the last message which should contain the structured data
-            last_message = chat_result.data[-1]
             try:
-                resume_content = json.loads(last_message["content"])
+                resume_content = json.loads(source["content"])
             except json.JSONDecodeError:
                 raise HTTPException(status_code=400, detail="Invalid chat session data")
-        else:
-            raise HTTPException(status_code=400, detail="Either resume_id or chat_session_id must be provided")
         
-        # Create portfolio record
-        portfolio = Portfolio(
+        # Create portfolio record; a client-supplied id makes the upsert
+        # below merge a retried submission into the row it already created
+        portfolio = Portfolio.model_construct(
+            id=request.id or str(uuid.uuid4()),
             user_id=request.user_id,
             job_description_id=request.job_description_id,
             resume_id=request.resume_id,
@@ -1432,73 +2225,97 @@ async def generate_portfolio(request: PortfolioGenerateRequest, background_tasks
             method=PortfolioMethod.RESUME if request.resume_id else PortfolioMethod.CHAT,
             status=PortfolioStatus.PROCESSING
         )
-        portfolio_data = convert_datetimes_to_iso(portfolio.model_dump())
-        result = supabase.table("portfolios").insert(portfolio_data).execute()
-        
-        # Process in background
-        def process_portfolio_sync():
-            try:
-                if isinstance(resume_content, dict):
-                    # If it's already structured (from chat), use it directly
-                    structured_content = resume_content
-                else:
-                    # If it's text (from resume), analyze it
-                    structured_content = llm_service.analyze_resume(resume_content)
-                
-                # If job description is provided, use it to enhance the portfolio
-                if job_description:
-                    structured_content = llm_service.enhance_portfolio_with_jd(structured_content, job_description)
-                
-                portfolio_content = llm_service.generate_portfolio_content(structured_content)
-                supabase.table("portfolios").update({
-                    "status": PortfolioStatus.COMPLETED,
-                    "content": structured_content,
-                    "html": portfolio_content["html"],
-                    "css": portfolio_content["css"],
-                    "updated_at": datetime.utcnow().isoformat()
-                }).eq("id", portfolio.id).execute()
-            except Exception as e:
-                logger.error(f"Error processing portfolio: {str(e)}")
-                supabase.table("portfolios").update({
-                    "status": PortfolioStatus.ERROR,
-                    "updated_at": datetime.utcnow().isoformat()
-                }).eq("id", portfolio.id).execute()
-        
-        background_tasks.add_task(process_portfolio_sync)
-        return result.data[0]
+        result = await db_upsert("portfolios", model_to_json(portfolio))
+
+        await submit_job("process_portfolio", portfolio.id, resume_content, job_description)
+        return result[0]
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Error generating portfolio: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/resumes/{user_id}/latest")
-async def get_latest_resume(user_id: str):
+async def get_latest_resume(user_id: str, request: Request):
     """Get the latest resume for a user"""
     try:
-        result = supabase.table("resumes").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(1).execute()
-        if not result.data:
+        result = await db_select("resumes", {"user_id": user_id}, order="created_at", desc=True, limit=1)
+        if not result:
             raise HTTPException(status_code=404, detail="No resume found for user")
-        return result.data[0]
+        return conditional_json_response(result[0], request)
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Error fetching latest resume: {str(e)}")
         raise HTTPException(status_code=500, detail="Error fetching latest resume")
 
 @app.get("/api/job-descriptions/{user_id}/latest")
-async def get_latest_job_description(user_id: str):
+async def get_latest_job_description(user_id: str, request: Request):
     """Get the latest job description for a user"""
     try:
-        result = supabase.table("job_descriptions").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(1).execute()
-        if not result.data:
+        result = await db_select("job_descriptions", {"user_id": user_id}, order="created_at", desc=True, limit=1)
+        if not result:
             raise HTTPException(status_code=404, detail="No job description found for user")
-        return result.data[0]
+        return conditional_json_response(result[0], request)
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Error fetching latest job description: {str(e)}")
         raise HTTPException(status_code=500, detail="Error fetching latest job description")
 
+@app.websocket("/ws/portfolios/{user_id}")
+async def portfolio_updates(websocket: WebSocket, user_id: str):
+    """
+    Push portfolio status changes for a user over a WebSocket.
+
+    PostgREST does not expose the Realtime change feed, so the server does
+    the change detection itself: one cheap projection query per interval,
+    and only rows whose status actually moved are sent. Clients subscribe
+    here instead of re-downloading the full portfolio list on every refresh.
+    """
+    await websocket.accept()
+    seen: Dict[str, str] = {}
+    try:
+        while True:
+            rows = await db_select(
+                "portfolios", {"user_id": user_id},
+                columns="id,title,status,updated_at", order="updated_at", desc=True
+            )
+            changed = []
+            for row in rows:
+                marker = f"{row['status']}:{row['updated_at']}"
+                if seen.get(row["id"]) != marker:
+                    seen[row["id"]] = marker
+                    changed.append(row)
+            if changed:
+                await websocket.send_bytes(orjson.dumps(changed, default=str))
+            await asyncio.sleep(2)
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Error streaming portfolio updates for user {user_id}: {str(e)}")
+        await websocket.close(code=1011)
+
 @app.post("/api/interviews/feedback", response_model=Dict[str, str])
 async def get_interview_feedback(request: InterviewFeedbackRequest):
     """Generate detailed feedback for a completed interview"""
     try:
-        feedback = llm_service.generate_interview_feedback(request.questions, request.score)
+        # Feedback is deterministic in (questions, score), so identical
+        # requests — reopened interviews, retries — skip the Groq call
+        key = hashlib.blake2b(
+            orjson.dumps(
+                {"q": _adapter_for(List[InterviewQuestion]).dump_python(request.questions, mode="json"),
+                 "s": request.score},
+                option=orjson.OPT_SORT_KEYS
+            ),
+            digest_size=16
+        ).hexdigest()
+        feedback = await llm_cache_get(key)
+        if feedback is None:
+            feedback = await asyncio.to_thread(
+                llm_service.generate_interview_feedback, request.questions, request.score
+            )
+            await llm_cache_set(key, feedback)
         return {"feedback": feedback}
     except Exception as e:
         logger.error(f"Error generating interview feedback: {str(e)}")
@@ -1508,10 +2325,17 @@ async def get_interview_feedback(request: InterviewFeedbackRequest):
 
 # Mount static files for frontend BEFORE catch-all route
 frontend_path = Path(__file__).parent / "frontend" / "dist"
+# index.html is served for every SPA route, so read it once at import time
+# and answer from memory with a precomputed ETag instead of re-opening the
+# file per request
+_index_bytes: Optional[bytes] = None
+_index_etag: Optional[str] = None
 if frontend_path.exists():
     # Mount static files at root BEFORE catch-all route
     app.mount("/assets", StaticFiles(directory=str(frontend_path / "assets"), html=False), name="assets")
     app.mount("/", StaticFiles(directory=str(frontend_path), html=True), name="static")
+    _index_bytes = (frontend_path / "index.html").read_bytes()
+    _index_etag = f'"{hashlib.blake2b(_index_bytes, digest_size=16).hexdigest()}"'
     logger.info(f"Frontend static files mounted at root from {frontend_path}")
 else:
     logger.warning(f"Frontend static files not found at {frontend_path}")
@@ -1524,16 +2348,15 @@ async def serve_spa(full_path: str, request: Request):
     if full_path.startswith("api/") or full_path.startswith("assets/"):
         raise HTTPException(status_code=404, detail="Route not found")
     
-    # For all other routes, serve index.html
-    if frontend_path.exists():
-        try:
-            return FileResponse(
-                frontend_path / "index.html",
-                media_type="text/html"
-            )
-        except Exception as e:
-            logger.error(f"Error serving frontend: {str(e)}")
-            raise HTTPException(status_code=500, detail="Error serving frontend")
+    # For all other routes, serve the in-memory index.html
+    if _index_bytes is not None:
+        if request.headers.get("if-none-match") == _index_etag:
+            return Response(status_code=304, headers={"ETag": _index_etag})
+        return Response(
+            content=_index_bytes,
+            media_type="text/html",
+            headers={"ETag": _index_etag, "Cache-Control": "no-cache"}
+        )
     raise HTTPException(status_code=404, detail="Frontend not found")
 
 if __name__ == "__main__":
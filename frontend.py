@@ -1,6 +1,7 @@
 import os
 import json
 import requests
+from requests.adapters import HTTPAdapter
 import streamlit as st
 import pandas as pd
 import uuid
@@ -10,6 +11,18 @@ import uuid
 BACKEND_URL = "http://localhost:8000"
 USER_ID = "test-user-123"  # (No auth for now, so a dummy user id is used.)
 
+def get_http_session():
+    """Return a shared requests.Session stored in st.session_state, so reruns reuse pooled backend connections instead of redoing TCP + TLS per call."""
+    if "http" not in st.session_state:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        st.session_state["http"] = session
+    return st.session_state["http"]
+
+http = get_http_session()
+
 # --- Helper Functions ---
 
 def call_resume_upload_api(title, file_bytes, filename):
@@ -17,7 +30,7 @@ def call_resume_upload_api(title, file_bytes, filename):
     url = f"{BACKEND_URL}/api/portfolios/resume"
     payload = {"user_id": USER_ID, "title": title}
     files = {"file": (filename, file_bytes, "application/pdf")}  # (Adjust mime type if docx.)
-    resp = requests.post(url, data=payload, files=files)
+    resp = http.post(url, data=payload, files=files)
     if resp.status_code == 200:
          return resp.json()
     else:
@@ -28,7 +41,7 @@ def call_chat_start_api(title):
     """Call the chat start endpoint (POST /api/portfolios/chat/start) to initiate a chat-based portfolio creation."""
     url = f"{BACKEND_URL}/api/portfolios/chat/start"
     payload = {"user_id": USER_ID, "title": title}
-    resp = requests.post(url, json=payload)
+    resp = http.post(url, json=payload)
     if resp.status_code == 200:
          return resp.json()
     else:
@@ -38,7 +51,7 @@ def call_chat_start_api(title):
 def fetch_portfolio_details(portfolio_id):
     """Call GET /api/portfolios/{portfolio_id} to fetch portfolio details (e.g. status, content, html, css)."""
     url = f"{BACKEND_URL}/api/portfolios/{portfolio_id}"
-    resp = requests.get(url)
+    resp = http.get(url)
     if resp.status_code == 200:
          return resp.json()
     else:
@@ -48,17 +61,18 @@ def fetch_portfolio_details(portfolio_id):
 def fetch_portfolio_export(portfolio_id):
     """Call GET /api/portfolios/{portfolio_id}/export to fetch the generated HTML and CSS."""
     url = f"{BACKEND_URL}/api/portfolios/{portfolio_id}/export"
-    resp = requests.get(url)
+    resp = http.get(url)
     if resp.status_code == 200:
          return resp.json()
     else:
          st.error(f"Error exporting portfolio: {resp.status_code} – {resp.text}")
          return None
 
+@st.cache_data(ttl=30)
 def fetch_all_portfolios():
-    """Call GET /api/users/{user_id}/portfolios to fetch a list of all historical portfolios."""
+    """Call GET /api/users/{user_id}/portfolios to fetch a list of all historical portfolios. (Cached for 30s so routine reruns don't re-hit the backend.)"""
     url = f"{BACKEND_URL}/api/users/{USER_ID}/portfolios"
-    resp = requests.get(url)
+    resp = http.get(url)
     if resp.status_code == 200:
          return resp.json()
     else:
@@ -83,12 +97,13 @@ with tab1:
      if uploaded_file is not None and title:
           if st.button("Generate Portfolio (Resume)", key="resume_btn"):
                with st.spinner("Uploading resume and generating portfolio (this may take a moment)..."):
-                    file_bytes = uploaded_file.read()
                     url = f"{BACKEND_URL}/api/portfolios/resume?user_id={USER_ID}&title={title}"
-                    files = {"file": (uploaded_file.name, file_bytes, "application/pdf")}  # (Adjust mime type if docx.)
-                    resp = requests.post(url, files=files)
+                    # (Pass the file object itself; requests still builds the multipart body in memory, but this avoids holding a second full copy from .read().)
+                    files = {"file": (uploaded_file.name, uploaded_file, "application/pdf")}  # (Adjust mime type if docx.)
+                    resp = http.post(url, files=files)
                     if resp.status_code == 200:
                          st.success("Portfolio creation (resume) triggered. (Refreshing table below.)")
+                         fetch_all_portfolios.clear()  # (Drop the cached list so the new portfolio shows up on rerun.)
                          st.rerun()  # (Refresh the table (historical portfolios) automatically.)
                     else:
                          st.error(f"Error: {resp.status_code} – {resp.text}")
@@ -104,7 +119,7 @@ with tab2:
      def start_chat():
           url = f"{BACKEND_URL}/api/portfolios/chat/start"
           payload = {"user_id": USER_ID, "title": chat_title}
-          resp = requests.post(url, json=payload)
+          resp = http.post(url, json=payload)
           if resp.status_code == 200:
                data = resp.json()
                chat_state["portfolio_id"] = data["portfolio_id"]
@@ -118,7 +133,7 @@ with tab2:
      def send_chat_answer(answer):
           url = f"{BACKEND_URL}/api/portfolios/chat/answer"
           payload = {"portfolio_id": chat_state["portfolio_id"], "answer": answer}
-          resp = requests.post(url, json=payload)
+          resp = http.post(url, json=payload)
           if resp.status_code == 200:
                data = resp.json()
                if data["status"] == "in_progress":
@@ -133,6 +148,7 @@ with tab2:
                     chat_state["status"] = data["status"]
                     st.session_state["chat_state"] = chat_state
                     st.success("Portfolio generated. (Refreshing table below.)")
+                    fetch_all_portfolios.clear()  # (Drop the cached list so the new portfolio shows up on rerun.)
                     st.rerun()
           else:
                st.error(f"Error: {resp.status_code} – {resp.text}")
@@ -155,23 +171,25 @@ with tab2:
 
 # --- Lower Section: Historical Portfolios Table ---
 st.header("Historical Portfolios")
-(st.button("Refresh Table (Historical Portfolios)", key="refresh_table") and st.rerun())
+if st.button("Refresh Table (Historical Portfolios)", key="refresh_table"):
+     fetch_all_portfolios.clear()  # (Explicit refresh bypasses the 30s cache.)
+     st.rerun()
 all_portfolios = fetch_all_portfolios()
 if all_portfolios:
      # (Convert the list of dicts into a pandas DataFrame for display.)
      df = pd.DataFrame(all_portfolios)
      st.dataframe(df, use_container_width=True)
-     # (For each portfolio, if its status is "completed", show "View" and "Export" buttons.)
-     for idx, row in df.iterrows():
-          if row.get("status") == "completed":
-               portfolio_id = row.get("id")
+     # (For each portfolio, if its status is "completed", show "View" and "Export" buttons. itertuples avoids the per-row Series construction iterrows pays.)
+     for row in df.itertuples(index=False):
+          if getattr(row, "status", None) == "completed":
+               portfolio_id = getattr(row, "id", None)
                col1, col2 = st.columns(2)
                with col1:
                     if st.button(f"View Portfolio (ID: {portfolio_id})", key=f"view_{portfolio_id}"):
                          export_resp = fetch_portfolio_export(portfolio_id)
                          if export_resp:
                               # (Open a new tab (or a modal) to display the portfolio.)
-                              st.markdown(f"<a href='data:text/html;base64,{export_resp['html']}' target='_blank'>Open Portfolio (New Tab)</a>", unsafe_allow_html=True)
+                              st.markdown(f"<a href='data:text/html;base64,{export_resp['html_b64']}' target='_blank'>Open Portfolio (New Tab)</a>", unsafe_allow_html=True)
                with col2:
                     if st.button(f"Export (ID: {portfolio_id})", key=f"export_{portfolio_id}"):
                          export_resp = fetch_portfolio_export(portfolio_id)
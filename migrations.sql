@@ -5,6 +5,7 @@ DROP TABLE IF EXISTS interview_sessions CASCADE;
 DROP TABLE IF EXISTS cover_letters CASCADE;
 DROP TABLE IF EXISTS portfolios CASCADE;
 DROP TABLE IF EXISTS optimized_resumes CASCADE;
+DROP TABLE IF EXISTS chat_messages CASCADE;
 DROP TABLE IF EXISTS chat_sessions CASCADE;
 DROP TABLE IF EXISTS resumes CASCADE;
 DROP TABLE IF EXISTS job_descriptions CASCADE;
@@ -39,6 +40,15 @@ CREATE TABLE chat_sessions (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Create chat_messages table
+CREATE TABLE chat_messages (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    chat_session_id UUID NOT NULL REFERENCES chat_sessions(id),
+    content TEXT NOT NULL,
+    role TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Create optimized_resumes table
 CREATE TABLE optimized_resumes (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -94,7 +104,9 @@ CREATE TABLE interview_scores (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     user_id UUID NOT NULL,
     job_description_id UUID REFERENCES job_descriptions(id),
+    job_role TEXT NOT NULL,
     score INTEGER NOT NULL,
+    feedback TEXT NOT NULL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -110,8 +122,11 @@ CREATE TABLE career_guides (
 );
 
 -- Add indexes for better query performance
-CREATE INDEX idx_job_descriptions_user_id ON job_descriptions(user_id);
-CREATE INDEX idx_resumes_user_id ON resumes(user_id);
+-- Composite (user_id, created_at DESC) serves both the per-user list views
+-- and the "latest per user" order + limit 1 lookups as a single index scan;
+-- it also covers plain user_id filters, so no separate user_id index needed
+CREATE INDEX idx_job_descriptions_user_created ON job_descriptions(user_id, created_at DESC);
+CREATE INDEX idx_resumes_user_created ON resumes(user_id, created_at DESC);
 CREATE INDEX idx_chat_sessions_portfolio_id ON chat_sessions(portfolio_id);
 CREATE INDEX idx_optimized_resumes_user_id ON optimized_resumes(user_id);
 CREATE INDEX idx_optimized_resumes_original_resume_id ON optimized_resumes(original_resume_id);
@@ -129,4 +144,120 @@ CREATE INDEX idx_interview_scores_job_description_id ON interview_scores(job_des
 CREATE INDEX idx_career_guides_user_id ON career_guides(user_id);
 CREATE INDEX idx_career_guides_resume_id ON career_guides(resume_id);
 CREATE INDEX idx_career_guides_job_description_id ON career_guides(job_description_id);
-CREATE INDEX idx_portfolios_chat_session_id ON portfolios(chat_session_id); 
\ No newline at end of file
+CREATE INDEX idx_portfolios_chat_session_id ON portfolios(chat_session_id);
+-- Serves both full-history reads and latest-message lookups per session
+CREATE INDEX idx_chat_messages_session_created ON chat_messages(chat_session_id, created_at DESC);
+
+-- Maintain updated_at in the database so application writers don't have to
+-- send a client-side timestamp with every update
+CREATE OR REPLACE FUNCTION set_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at := now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER job_descriptions_set_updated_at BEFORE UPDATE ON job_descriptions
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER resumes_set_updated_at BEFORE UPDATE ON resumes
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER chat_sessions_set_updated_at BEFORE UPDATE ON chat_sessions
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER optimized_resumes_set_updated_at BEFORE UPDATE ON optimized_resumes
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER portfolios_set_updated_at BEFORE UPDATE ON portfolios
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER cover_letters_set_updated_at BEFORE UPDATE ON cover_letters
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER interview_sessions_set_updated_at BEFORE UPDATE ON interview_sessions
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER career_guides_set_updated_at BEFORE UPDATE ON career_guides
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+-- Insert a resume and its portfolio in one transaction so the resume upload
+-- endpoint makes a single PostgREST round-trip instead of two sequential inserts
+CREATE OR REPLACE FUNCTION create_portfolio_with_resume(resume_row JSONB, portfolio_row JSONB)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO resumes
+    SELECT * FROM jsonb_populate_record(NULL::resumes, resume_row);
+
+    INSERT INTO portfolios
+    SELECT * FROM jsonb_populate_record(NULL::portfolios, portfolio_row);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Record an interview answer atomically and report whether the session is
+-- complete, so the answer endpoint needs one round-trip instead of chaining
+-- select session → update questions → select job description title
+CREATE OR REPLACE FUNCTION answer_and_maybe_score(interview_id UUID, idx INT, ans TEXT)
+RETURNS JSONB AS $$
+DECLARE
+    session_row interview_sessions%ROWTYPE;
+    updated_questions JSONB;
+    answered INT;
+    total INT;
+    jd_title TEXT;
+BEGIN
+    SELECT * INTO session_row FROM interview_sessions
+    WHERE id = interview_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('found', false);
+    END IF;
+
+    total := jsonb_array_length(session_row.questions);
+    IF idx < 0 OR idx >= total THEN
+        RETURN jsonb_build_object('found', true, 'valid_index', false);
+    END IF;
+
+    updated_questions := jsonb_set(session_row.questions, ARRAY[idx::text, 'answer'], to_jsonb(ans));
+
+    UPDATE interview_sessions
+    SET questions = updated_questions
+    WHERE id = interview_id;
+
+    SELECT count(*) INTO answered
+    FROM jsonb_array_elements(updated_questions) q
+    WHERE coalesce(q->>'answer', '') <> '';
+
+    SELECT title INTO jd_title FROM job_descriptions
+    WHERE id = session_row.job_description_id;
+
+    RETURN jsonb_build_object(
+        'found', true,
+        'valid_index', true,
+        'complete', answered = total,
+        'answered', answered,
+        'total', total,
+        'job_title', jd_title,
+        'user_id', session_row.user_id,
+        'job_description_id', session_row.job_description_id,
+        'questions', updated_questions
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Persist a finished interview's score row and stamp the session score in
+-- one transaction, returning the new score id
+CREATE OR REPLACE FUNCTION finalize_interview(iid UUID, score_value INT, feedback_text TEXT, role_title TEXT)
+RETURNS UUID AS $$
+DECLARE
+    session_row interview_sessions%ROWTYPE;
+    new_score_id UUID;
+BEGIN
+    SELECT * INTO session_row FROM interview_sessions
+    WHERE id = iid FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO interview_scores (user_id, job_description_id, job_role, score, feedback)
+    VALUES (session_row.user_id, session_row.job_description_id, role_title, score_value, feedback_text)
+    RETURNING id INTO new_score_id;
+
+    UPDATE interview_sessions SET score = score_value WHERE id = iid;
+
+    RETURN new_score_id;
+END;
+$$ LANGUAGE plpgsql;
\ No newline at end of file
@@ -6,7 +6,9 @@ Handles environment variables for both local development and Hugging Face Spaces
 import os
 import logging
 from typing import Optional
-from dotenv import load_dotenv
+
+from pydantic import SecretStr, ValidationError
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 # Configure logging
 logging.basicConfig(
@@ -15,101 +17,66 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-class SecretsManager:
-    """Manages environment variables and secrets for the application."""
-    
-    # Required environment variables
-    REQUIRED_VARS = {
-        'SUPABASE_URL': 'Supabase project URL',
-        'SUPABASE_KEY': 'Supabase API key',
-        'GROQ_API_KEY': 'Groq LLM API key'
-    }
-    
-    def __init__(self):
-        """Initialize the secrets manager."""
-        # Try to load from .env file first (for local development)
-        load_dotenv()
-        
-        # Check if we're running in Hugging Face Spaces
-        self.is_hf_space = os.getenv('SPACE_ID') is not None
-        
-        if self.is_hf_space:
-            logger.info("Running in Hugging Face Spaces environment")
-        else:
-            logger.info("Running in local development environment")
-    
-    def get_secret(self, key: str) -> Optional[str]:
-        """
-        Get a secret value from environment variables.
-        
-        Args:
-            key (str): The name of the environment variable
-            
-        Returns:
-            Optional[str]: The value of the environment variable, or None if not found
-            
-        Raises:
-            ValueError: If a required secret is missing
-        """
-        value = os.getenv(key)
-        
-        if key in self.REQUIRED_VARS and not value:
-            error_msg = f"Missing required environment variable: {key} ({self.REQUIRED_VARS[key]})"
-            if self.is_hf_space:
-                error_msg += ". Please add it to your Hugging Face Space secrets."
-            else:
-                error_msg += ". Please add it to your .env file."
-            raise ValueError(error_msg)
-            
-        return value
-    
-    def validate_secrets(self) -> bool:
-        """
-        Validate that all required secrets are present.
-        
-        Returns:
-            bool: True if all required secrets are present
-            
-        Raises:
-            ValueError: If any required secrets are missing
-        """
-        missing_vars = []
-        
-        for var_name, description in self.REQUIRED_VARS.items():
-            if not self.get_secret(var_name):
-                missing_vars.append(f"{var_name} ({description})")
-        
-        if missing_vars:
-            error_msg = "Missing required environment variables:\n"
-            for var in missing_vars:
-                if self.is_hf_space:
-                    error_msg += f"- {var}. Please add it to your Hugging Face Space secrets.\n"
-                else:
-                    error_msg += f"- {var}. Please add it to your .env file.\n"
-            raise ValueError(error_msg)
-        
-        return True
+class Settings(BaseSettings):
+    """
+    All environment configuration, parsed and validated once at import.
+
+    pydantic-settings reads the environment (and .env for local development)
+    a single time into this frozen model, so later access is a plain
+    attribute read instead of an os.getenv call plus validation per lookup.
+    """
+
+    supabase_url: str
+    supabase_key: SecretStr
+    groq_api_key: SecretStr
+    # Optional comma-separated rotation pool; falls back to groq_api_key
+    groq_api_keys: Optional[str] = None
+    # Set by Hugging Face Spaces; only used to tailor error messages
+    space_id: Optional[str] = None
+
+    model_config = SettingsConfigDict(env_file=".env", frozen=True, extra="ignore")
+
+def _is_hf_space() -> bool:
+    return os.getenv('SPACE_ID') is not None
 
-# Create a singleton instance
-secrets_manager = SecretsManager()
+# Parse and validate secrets on module import
+try:
+    settings = Settings()
+    if _is_hf_space():
+        logger.info("Running in Hugging Face Spaces environment")
+    else:
+        logger.info("Running in local development environment")
+    logger.info("All required secrets are present")
+except ValidationError as e:
+    missing = ", ".join(str(error["loc"][0]).upper() for error in e.errors())
+    if _is_hf_space():
+        hint = "Please add them to your Hugging Face Space secrets."
+    else:
+        hint = "Please add them to your .env file."
+    logger.error(f"Missing or invalid environment variables: {missing}. {hint}")
+    raise
 
 # Convenience functions for accessing secrets
 def get_supabase_url() -> str:
     """Get the Supabase project URL."""
-    return secrets_manager.get_secret('SUPABASE_URL')
+    return settings.supabase_url
 
 def get_supabase_key() -> str:
     """Get the Supabase API key."""
-    return secrets_manager.get_secret('SUPABASE_KEY')
+    return settings.supabase_key.get_secret_value()
 
 def get_groq_api_key() -> str:
     """Get the Groq LLM API key."""
-    return secrets_manager.get_secret('GROQ_API_KEY')
+    return settings.groq_api_key.get_secret_value()
 
-# Validate secrets on module import
-try:
-    secrets_manager.validate_secrets()
-    logger.info("All required secrets are present")
-except ValueError as e:
-    logger.error(str(e))
-    raise 
\ No newline at end of file
+def get_groq_api_keys() -> list:
+    """
+    Get all configured Groq API keys.
+
+    Supports an optional comma-separated GROQ_API_KEYS variable so multiple
+    free-tier keys can be rotated for higher effective throughput. Falls back
+    to the single required GROQ_API_KEY.
+    """
+    if settings.groq_api_keys:
+        return [key.strip() for key in settings.groq_api_keys.split(',') if key.strip()]
+    return [settings.groq_api_key.get_secret_value()]